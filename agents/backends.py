@@ -0,0 +1,188 @@
+"""Model backends for the agent loop.
+
+``BaseAgent`` sends every chat completion request through a backend. The
+default ``OpenAIBackend`` talks to the Braintrust AI proxy; ``ScriptedBackend``
+is an offline stand-in that emits realistic tool-call sequences with a
+configurable latency, so the orchestration, SQLite and serialization overhead
+can be measured (and regression-tested) without the network.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import time
+
+import braintrust
+from openai import AsyncOpenAI, OpenAI
+from openai.types.chat import ChatCompletion
+
+from agents.history import estimate_tokens
+
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "openai")
+SCRIPTED_LLM_LATENCY = float(os.environ.get("SCRIPTED_LLM_LATENCY", "0"))
+SCRIPTED_LLM_JITTER = float(os.environ.get("SCRIPTED_LLM_JITTER", "0"))
+
+PROXY_URL = "https://api.braintrust.dev/v1/proxy"
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "eval", "dataset.json")
+DEFAULT_SQL = "SELECT COUNT(*) AS games FROM games"
+
+
+class OpenAIBackend:
+    """Chat completions through the Braintrust AI proxy, traced with wrap_openai."""
+
+    def __init__(self, api_key: str = None, base_url: str = PROXY_URL):
+        self.api_key = api_key if api_key is not None else os.environ.get("BRAINTRUST_API_KEY", "")
+        self.base_url = base_url
+        self._client = None
+        self._async_client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = braintrust.wrap_openai(OpenAI(base_url=self.base_url, api_key=self.api_key))
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            self._async_client = braintrust.wrap_openai(AsyncOpenAI(base_url=self.base_url, api_key=self.api_key))
+        return self._async_client
+
+    def create(self, **kwargs):
+        return self.client.chat.completions.create(**kwargs)
+
+    async def acreate(self, **kwargs):
+        return await self.async_client.chat.completions.create(**kwargs)
+
+
+def _field(message, name):
+    if isinstance(message, dict):
+        return message.get(name)
+    return getattr(message, name, None)
+
+
+def load_reference_sql(path: str = DATASET_PATH) -> dict:
+    """Map each eval question to its reference SQL."""
+    try:
+        with open(path) as f:
+            return {case["input"]: case["metadata"]["sql_query"] for case in json.load(f)}
+    except FileNotFoundError:
+        return {}
+
+
+class ScriptedBackend:
+    """Deterministic offline model that plays the agent's expected tool-calling script.
+
+    For the supervisor it calls ``ask_sql_agent`` with the user question and
+    then answers with the tool result. For the SQL agent it runs
+    ``list_tables`` -> ``describe_table`` -> ``run_sql_query`` -> answer,
+    skipping the discovery steps when the system prompt already carries the
+    schema catalog. SQL comes from ``sql_for`` (question -> SQL), by default
+    the reference queries in ``eval/dataset.json``.
+    """
+
+    def __init__(self, latency: float = SCRIPTED_LLM_LATENCY, jitter: float = SCRIPTED_LLM_JITTER,
+                 sql_for: dict = None, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.sql_for = sql_for if sql_for is not None else load_reference_sql()
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    def _delay(self) -> float:
+        if not self.latency and not self.jitter:
+            return 0.0
+        return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def create(self, **kwargs):
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        return self._respond(kwargs)
+
+    async def acreate(self, **kwargs):
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._respond(kwargs)
+
+    def _respond(self, kwargs: dict) -> ChatCompletion:
+        self.calls += 1
+        messages = kwargs["messages"]
+        tool_names = {t["function"]["name"] for t in kwargs.get("tools") or []}
+
+        last_user = max(i for i, m in enumerate(messages) if _field(m, "role") == "user")
+        question = _field(messages[last_user], "content")
+        tool_results = [m for m in messages[last_user + 1:] if _field(m, "role") == "tool"]
+
+        if "ask_sql_agent" in tool_names:
+            if not tool_results:
+                return self._completion(kwargs, tool_calls=[("ask_sql_agent", {"question": question})])
+            return self._completion(kwargs, content=f"Here is what the data shows:\n{_field(tool_results[-1], 'content')}")
+
+        if "run_sql_query" in tool_names:
+            sql = self.sql_for.get(question, DEFAULT_SQL)
+            steps = []
+            if "## Database Schema" not in (_field(messages[0], "content") or ""):
+                match = re.search(r"\bFROM\s+(\w+)", sql, re.IGNORECASE)
+                steps += [("list_tables", {}), ("describe_table", {"table_name": match.group(1) if match else "games"})]
+            steps.append(("run_sql_query", {"query": sql, "input_message": question}))
+            if len(tool_results) < len(steps):
+                return self._completion(kwargs, tool_calls=[steps[len(tool_results)]])
+            return self._completion(kwargs, content=f"Query results: {_field(tool_results[-1], 'content')}")
+
+        return self._completion(kwargs, content="I can only answer NBA data questions.")
+
+    def _completion(self, kwargs: dict, content: str = None, tool_calls: list = None) -> ChatCompletion:
+        turn = len(kwargs["messages"])
+        message = {"role": "assistant", "content": content}
+        if tool_calls:
+            message["tool_calls"] = [
+                {
+                    "id": f"call_{turn}_{i}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": json.dumps(args)},
+                }
+                for i, (name, args) in enumerate(tool_calls)
+            ]
+        completion_tokens = len(json.dumps(message)) // 4
+        prompt_tokens = estimate_tokens(kwargs["messages"])
+        return ChatCompletion.model_validate({
+            "id": f"scripted-{self.calls}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": kwargs["model"],
+            "choices": [{
+                "index": 0,
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+                "message": message,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+
+BACKENDS = {"openai": OpenAIBackend, "scripted": ScriptedBackend}
+
+_default_backend = None
+
+
+def get_backend():
+    """Return the shared backend selected by LLM_BACKEND."""
+    global _default_backend
+    if _default_backend is None:
+        if LLM_BACKEND not in BACKENDS:
+            raise ValueError(f"Unknown LLM_BACKEND {LLM_BACKEND!r}; expected one of {sorted(BACKENDS)}")
+        _default_backend = BACKENDS[LLM_BACKEND]()
+    return _default_backend
+
+
+def set_backend(backend):
+    """Replace the shared backend, e.g. with a configured ScriptedBackend in benchmarks."""
+    global _default_backend
+    _default_backend = backend
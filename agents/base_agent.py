@@ -1,62 +1,175 @@
 """Base agent class with OpenAI tool-calling loop and Braintrust tracing."""
 
+import asyncio
+import contextvars
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import braintrust
-from openai import OpenAI
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from agents.backends import get_backend
+from agents.llm_cache import LLMCacheMissError, cache_key, get_llm_cache
+
 # Module-level singletons
 BRAINTRUST_API_KEY = os.environ.get("BRAINTRUST_API_KEY", "")
 BRAINTRUST_PROJECT = os.environ.get("BRAINTRUST_PROJECT", "agent-evals-workshop")
+TOOL_WORKERS = int(os.environ.get("AGENT_TOOL_WORKERS", "8"))
+
+# Tracing needs an API key; offline runs (e.g. LLM_BACKEND=scripted) skip it
+logger = braintrust.init_logger(project=BRAINTRUST_PROJECT) if BRAINTRUST_API_KEY else None
+
+# Blocking tool work (SQLite queries) is offloaded here when agents run via arun()
+tool_executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="agent-tool")
 
-client = braintrust.wrap_openai(
-    OpenAI(
-        base_url="https://api.braintrust.dev/v1/proxy",
-        api_key=BRAINTRUST_API_KEY,
-    )
-)
 
-logger = braintrust.init_logger(project=BRAINTRUST_PROJECT)
+async def run_in_tool_executor(func, *args):
+    """Run a blocking function on the tool thread pool, keeping the current tracing context."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(tool_executor, ctx.run, func, *args)
 
 
 class BaseAgent:
     """Base agent with an OpenAI tool-calling loop."""
 
-    def __init__(self, system_prompt: str, tools: list, model: str = "gpt-5-mini"):
+    def __init__(self, system_prompt: str, tools: list, model: str = "gpt-5-mini", history=None, backend=None):
         self.system_prompt = system_prompt
         self.tools = tools
         self.model = model
+        # Model backend (agents.backends); defaults to the one selected by LLM_BACKEND
+        self.backend = backend or get_backend()
+        # Optional agents.history.HistoryManager that keeps _messages under a token budget
+        self.history = history
+        # Record/replay response cache; None unless LLM_CACHE_MODE is set
+        self.llm_cache = get_llm_cache()
+        self._messages = []
+        # Token usage summed over every completion this agent has made (cache hits included)
+        self.usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+
+    def reset(self):
+        """Drop the conversation history; the next run starts from the system prompt."""
         self._messages = []
 
     def execute_tool(self, name: str, args: dict):
         """Execute a tool by name. Override in subclasses."""
         raise NotImplementedError(f"Tool '{name}' not implemented")
 
-    # @braintrust.traced(name="base_agent_run")
-    def run(self, user_message: str) -> dict:
-        """Run the agent with a user message through the tool-calling loop."""
+    async def aexecute_tool(self, name: str, args: dict):
+        """Async variant of execute_tool. Defaults to running execute_tool on the tool thread pool."""
+        return await run_in_tool_executor(self.execute_tool, name, args)
+
+    def _start_turn(self, user_message: str):
         if not self._messages:
             self._messages = [{"role": "system", "content": self.system_prompt}]
 
         self._messages.append({"role": "user", "content": user_message})
 
-        while True:
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=self._messages,
-                tools=self.tools if self.tools else None,
-            )
+    def _completion_kwargs(self) -> dict:
+        if self.history is not None:
+            compacted = self.history.compact(self._messages)
+            if compacted is not self._messages:
+                self._messages = compacted
+                braintrust.current_span().log(metadata={"history_compaction": self.history.last_compaction})
+        return {
+            "model": self.model,
+            "messages": self._messages,
+            "tools": self.tools if self.tools else None,
+        }
+
+    def _cached_response(self, kwargs: dict):
+        """Return (cache key, cached response or None) for a request."""
+        if self.llm_cache is None:
+            return None, None
+        key = cache_key(kwargs)
+        if self.llm_cache.mode == "replay":
+            response = self.llm_cache.get(key)
+            if response is None:
+                raise LLMCacheMissError(f"No recorded response for request {key[:12]} (LLM_CACHE_MODE=replay)")
+            braintrust.current_span().log(metadata={"llm_cache": "hit", "llm_cache_key": key})
+            return key, response
+        return key, None
+
+    def _create_completion(self, kwargs: dict):
+        key, response = self._cached_response(kwargs)
+        if response is None:
+            response = self.backend.create(**kwargs)
+            if key is not None:
+                self.llm_cache.put(key, self.model, response)
+        return response
+
+    async def _acreate_completion(self, kwargs: dict):
+        key, response = self._cached_response(kwargs)
+        if response is None:
+            response = await self.backend.acreate(**kwargs)
+            if key is not None:
+                self.llm_cache.put(key, self.model, response)
+        return response
+
+    def _record_usage(self, response):
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        self.usage["calls"] += 1
+        self.usage["prompt_tokens"] += usage.prompt_tokens or 0
+        self.usage["completion_tokens"] += usage.completion_tokens or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.usage["cached_tokens"] += (getattr(details, "cached_tokens", None) or 0) if details else 0
+
+    def _handle_response(self, response):
+        # Validate we got a real response from the LLM
+        if not response or not response.choices:
+            raise ValueError("No response from LLM - check API configuration")
+        self._record_usage(response)
+
+        message = response.choices[0].message
+        self._messages.append(message)
+        return message
+
+    def _append_tool_result(self, tool_call, result):
+        self._messages.append({
+            "role": "tool",
+            "tool_call_id": tool_call.id,
+            "content": str(result),
+        })
+
+    def _run_tool_call(self, tool_call):
+        func_name = tool_call.function.name
+        func_args = json.loads(tool_call.function.arguments)
+
+        with braintrust.start_span(
+            name=func_name,
+            span_attributes={"type": "tool"},
+            input=func_args,
+        ) as span:
+            result = self.execute_tool(func_name, func_args)
+            span.log(output=result)
+        return result
+
+    async def _arun_tool_call(self, tool_call):
+        func_name = tool_call.function.name
+        func_args = json.loads(tool_call.function.arguments)
+
+        with braintrust.start_span(
+            name=func_name,
+            span_attributes={"type": "tool"},
+            input=func_args,
+        ) as span:
+            result = await self.aexecute_tool(func_name, func_args)
+            span.log(output=result)
+        return result
 
-            # Validate we got a real response from the LLM
-            if not response or not response.choices:
-                raise ValueError("No response from LLM - check API configuration")
+    # @braintrust.traced(name="base_agent_run")
+    def run(self, user_message: str) -> dict:
+        """Run the agent with a user message through the tool-calling loop."""
+        self._start_turn(user_message)
 
-            message = response.choices[0].message
-            self._messages.append(message)
+        while True:
+            response = self._create_completion(self._completion_kwargs())
+            message = self._handle_response(response)
 
             # If no tool calls, we're done
             if not message.tool_calls:
@@ -64,19 +177,24 @@ class BaseAgent:
 
             # Process each tool call
             for tool_call in message.tool_calls:
-                func_name = tool_call.function.name
-                func_args = json.loads(tool_call.function.arguments)
-
-                with braintrust.start_span(
-                    name=func_name,
-                    span_attributes={"type": "tool"},
-                    input=func_args,
-                ) as span:
-                    result = self.execute_tool(func_name, func_args)
-                    span.log(output=result)
-
-                self._messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "content": str(result),
-                })
+                result = self._run_tool_call(tool_call)
+                self._append_tool_result(tool_call, result)
+
+    async def arun(self, user_message: str) -> dict:
+        """Async variant of run that executes independent tool calls concurrently."""
+        self._start_turn(user_message)
+
+        while True:
+            response = await self._acreate_completion(self._completion_kwargs())
+            message = self._handle_response(response)
+
+            if not message.tool_calls:
+                return {"response": message.content}
+
+            # gather() preserves argument order, so tool results are appended
+            # in the original tool_call_id order regardless of completion order
+            results = await asyncio.gather(
+                *(self._arun_tool_call(tool_call) for tool_call in message.tool_calls)
+            )
+            for tool_call, result in zip(message.tool_calls, results):
+                self._append_tool_result(tool_call, result)
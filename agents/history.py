@@ -0,0 +1,146 @@
+"""Token-budgeted compaction of agent conversation history."""
+
+import json
+import os
+
+# Defaults (override via environment)
+HISTORY_TOKEN_BUDGET = int(os.environ.get("AGENT_HISTORY_TOKEN_BUDGET", "12000"))
+HISTORY_KEEP_TURNS = int(os.environ.get("AGENT_HISTORY_KEEP_TURNS", "3"))
+NOTE_RESULT_CHARS = 160
+
+# Rough conversion for OpenAI tokenizers on English/JSON text
+CHARS_PER_TOKEN = 4
+
+
+def _field(message, name):
+    """Read a field from either a plain dict message or an OpenAI message object."""
+    if isinstance(message, dict):
+        return message.get(name)
+    return getattr(message, name, None)
+
+
+def _tool_call_parts(tool_call):
+    function = _field(tool_call, "function")
+    return _field(tool_call, "id"), _field(function, "name"), _field(function, "arguments") or ""
+
+
+def estimate_tokens(messages: list) -> int:
+    """Cheap token estimate: total characters of content and tool-call arguments / 4."""
+    chars = 0
+    for message in messages:
+        chars += len(str(_field(message, "content") or ""))
+        for tool_call in _field(message, "tool_calls") or []:
+            _, name, arguments = _tool_call_parts(tool_call)
+            chars += len(name or "") + len(arguments)
+    return chars // CHARS_PER_TOKEN
+
+
+class HistoryManager:
+    """Keeps an agent's message history under a token budget.
+
+    The system prompt and the last ``keep_last_turns`` turns (a turn starts at
+    a user message) are always kept verbatim. When the history is over budget,
+    finished tool exchanges in older turns are first collapsed into a short
+    assistant note; if that is not enough, the oldest turns are dropped.
+    """
+
+    def __init__(self, token_budget: int = HISTORY_TOKEN_BUDGET, keep_last_turns: int = HISTORY_KEEP_TURNS):
+        self.token_budget = token_budget
+        self.keep_last_turns = keep_last_turns
+        self.metrics = {
+            "compactions": 0,
+            "tool_exchanges_collapsed": 0,
+            "turns_dropped": 0,
+            "tokens_before": 0,
+            "tokens_after": 0,
+            "tokens_saved": 0,
+        }
+        self.last_compaction = None
+
+    def compact(self, messages: list) -> list:
+        """Return a (possibly) compacted copy of ``messages``."""
+        tokens_before = estimate_tokens(messages)
+        if tokens_before <= self.token_budget:
+            return messages
+
+        head, turns = _split_turns(messages)
+        if len(turns) <= self.keep_last_turns:
+            return messages
+        old_turns = turns[: len(turns) - self.keep_last_turns]
+        recent_turns = turns[len(turns) - self.keep_last_turns:]
+
+        collapsed = 0
+        compacted_old = []
+        for turn in old_turns:
+            new_turn, n = _collapse_tool_exchanges(turn)
+            compacted_old.append(new_turn)
+            collapsed += n
+
+        dropped = 0
+        recent = [m for turn in recent_turns for m in turn]
+        while compacted_old and estimate_tokens(head + [m for t in compacted_old for m in t] + recent) > self.token_budget:
+            compacted_old.pop(0)
+            dropped += 1
+
+        result = head + [m for turn in compacted_old for m in turn] + recent
+        tokens_after = estimate_tokens(result)
+        self.last_compaction = {
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_after,
+            "tokens_saved": tokens_before - tokens_after,
+            "tool_exchanges_collapsed": collapsed,
+            "turns_dropped": dropped,
+        }
+        self.metrics["compactions"] += 1
+        for key, value in self.last_compaction.items():
+            self.metrics[key] += value
+        return result
+
+
+def _split_turns(messages: list):
+    """Split into (leading non-user messages, list of turns each starting at a user message)."""
+    head, turns = [], []
+    for message in messages:
+        if _field(message, "role") == "user":
+            turns.append([message])
+        elif turns:
+            turns[-1].append(message)
+        else:
+            head.append(message)
+    return head, turns
+
+
+def _collapse_tool_exchanges(turn: list):
+    """Replace each assistant tool-call message and its tool results with one short note."""
+    out = []
+    collapsed = 0
+    i = 0
+    while i < len(turn):
+        message = turn[i]
+        tool_calls = _field(message, "tool_calls")
+        if _field(message, "role") != "assistant" or not tool_calls:
+            out.append(message)
+            i += 1
+            continue
+
+        results = {}
+        j = i + 1
+        while j < len(turn) and _field(turn[j], "role") == "tool":
+            results[_field(turn[j], "tool_call_id")] = str(_field(turn[j], "content") or "")
+            j += 1
+
+        lines = []
+        for tool_call in tool_calls:
+            call_id, name, arguments = _tool_call_parts(tool_call)
+            try:
+                args = json.dumps(json.loads(arguments), separators=(",", ":"))
+            except ValueError:
+                args = arguments
+            result = results.get(call_id, "")
+            if len(result) > NOTE_RESULT_CHARS:
+                result = result[:NOTE_RESULT_CHARS] + "..."
+            lines.append(f"- {name}({args}) -> {result}")
+        out.append({"role": "assistant", "content": "Earlier tool calls (summarized):\n" + "\n".join(lines)})
+        collapsed += 1
+        i = j
+    return out, collapsed
@@ -0,0 +1,127 @@
+"""Content-addressed record/replay cache for chat completion responses.
+
+Modes (``LLM_CACHE_MODE``):
+- ``off``: every request goes to the model (default).
+- ``record``: every request goes to the model and the response is stored.
+- ``replay``: responses are served from the store; a request that was never
+  recorded raises ``LLMCacheMissError`` instead of calling the model.
+
+Keys are a SHA-256 over the model, messages, tools and any other request
+params, so a replay is only served for a byte-for-byte identical request.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from openai.types.chat import ChatCompletion
+
+LLM_CACHE_MODE = os.environ.get("LLM_CACHE_MODE", "off")
+LLM_CACHE_PATH = os.environ.get(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "llm_cache.db"),
+)
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+MODES = ("off", "record", "replay")
+
+
+class LLMCacheMissError(RuntimeError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+def _jsonable(obj):
+    # OpenAI message objects (pydantic models) appended by the agent loop
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(exclude_none=True)
+    raise TypeError(f"Cannot serialize {type(obj).__name__} for cache key")
+
+
+def cache_key(request: dict) -> str:
+    """Hash a chat.completions.create kwargs dict into a stable key."""
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=_jsonable)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed response store with least-recently-used eviction by total size."""
+
+    def __init__(self, mode: str = LLM_CACHE_MODE, path: str = LLM_CACHE_PATH,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES):
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM cache mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key       TEXT PRIMARY KEY,
+                model     TEXT NOT NULL,
+                response  TEXT NOT NULL,
+                size      INTEGER NOT NULL,
+                created   REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return ChatCompletion.model_validate_json(row[0])
+
+    def put(self, key: str, model: str, response):
+        payload = response.model_dump_json()
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, payload, len(payload), now, now),
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+
+
+def get_llm_cache():
+    """Return the shared cache configured by LLM_CACHE_MODE, or None when it is off."""
+    global _cache
+    if LLM_CACHE_MODE == "off":
+        return None
+    if _cache is None:
+        _cache = LLMResponseCache()
+    return _cache
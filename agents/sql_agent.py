@@ -4,23 +4,47 @@ import json
 
 import braintrust
 
-from agents.base_agent import BaseAgent
+from agents.base_agent import BaseAgent, run_in_tool_executor
 from prompts.sql_prompt import SQL_SYSTEM_PROMPT
-from tools.sql_tools import SQL_TOOLS, run_sql_query, list_tables, describe_table
+from tools.sql_tools import SQL_TOOLS, run_sql_query, list_tables, describe_table, get_schema_catalog
+
+
+def build_system_prompt(system_prompt: str, include_schema: bool = True) -> str:
+    """Append the cached schema catalog to a system prompt so the agent can skip schema discovery."""
+    if not include_schema:
+        return system_prompt
+    try:
+        schema = get_schema_catalog().prompt_section()
+    except Exception:
+        # No database yet; fall back to discovering the schema with tools
+        return system_prompt
+    return f"{system_prompt.rstrip()}\n\n{schema}\n"
 
 
 class SQLAgent(BaseAgent):
-    def __init__(self, system_prompt=None):
+    def __init__(self, system_prompt=None, include_schema=True, history=None, model="gpt-5-mini"):
         super().__init__(
-            system_prompt=system_prompt or SQL_SYSTEM_PROMPT,
+            system_prompt=build_system_prompt(system_prompt or SQL_SYSTEM_PROMPT, include_schema),
             tools=SQL_TOOLS,
-            model="gpt-5-mini",
+            model=model,
+            history=history,
         )
         self._last_sql_query = None
 
     def execute_tool(self, name: str, args: dict):
         if name == "run_sql_query":
             self._last_sql_query = args["query"]
+        return self._call_tool(name, args)
+
+    async def aexecute_tool(self, name: str, args: dict):
+        # Record the query here, where calls start in tool_call order, rather
+        # than from the worker thread where they may finish in any order
+        if name == "run_sql_query":
+            self._last_sql_query = args["query"]
+        return await run_in_tool_executor(self._call_tool, name, args)
+
+    def _call_tool(self, name: str, args: dict):
+        if name == "run_sql_query":
             return run_sql_query(args["query"], args.get("input_message", ""))
         elif name == "list_tables":
             return list_tables()
@@ -31,6 +55,14 @@ class SQLAgent(BaseAgent):
 
     @braintrust.traced(name="sql_agent")
     def run(self, user_message: str) -> dict:
+        self._last_sql_query = None
         result = super().run(user_message)
         result["sql_query"] = self._last_sql_query
         return result
+
+    @braintrust.traced(name="sql_agent")
+    async def arun(self, user_message: str) -> dict:
+        self._last_sql_query = None
+        result = await super().arun(user_message)
+        result["sql_query"] = self._last_sql_query
+        return result
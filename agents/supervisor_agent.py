@@ -1,6 +1,8 @@
 """Supervisor Agent — delegates data questions to the SQL Agent."""
 
 import json
+import os
+import threading
 
 import braintrust
 
@@ -8,6 +10,14 @@ from agents.base_agent import BaseAgent
 from agents.sql_agent import SQLAgent
 from prompts.supervisor_prompt import SUPERVISOR_SYSTEM_PROMPT
 
+# How ask_sql_agent obtains a SQL agent: "fresh" (new agent per call),
+# "warm" (one reused agent) or "pool" (up to SQL_AGENT_POOL_SIZE reused agents)
+SQL_AGENT_REUSE = os.environ.get("SQL_AGENT_REUSE", "fresh")
+SQL_AGENT_POOL_SIZE = int(os.environ.get("SQL_AGENT_POOL_SIZE", "4"))
+# Reset policy for reused agents
+SQL_AGENT_MAX_QUESTIONS = int(os.environ.get("SQL_AGENT_MAX_QUESTIONS", "8"))
+SQL_AGENT_MAX_MESSAGES = int(os.environ.get("SQL_AGENT_MAX_MESSAGES", "60"))
+
 SUPERVISOR_TOOLS = [
     {
         "type": "function",
@@ -29,26 +39,111 @@ SUPERVISOR_TOOLS = [
 ]
 
 
+class SQLAgentPool:
+    """Warm SQL agents reused across ask_sql_agent calls within one supervisor session.
+
+    A reused agent keeps its message history, so follow-up questions can build
+    on earlier schema context and query results instead of starting over. Each
+    agent is reset once it has answered ``max_questions`` questions or its
+    history exceeds ``max_messages`` messages. At most ``size`` idle agents are
+    kept; concurrent calls beyond that get a fresh agent rather than waiting.
+    """
+
+    def __init__(self, size: int = 1, max_questions: int = SQL_AGENT_MAX_QUESTIONS,
+                 max_messages: int = SQL_AGENT_MAX_MESSAGES):
+        self.size = size
+        self.max_questions = max_questions
+        self.max_messages = max_messages
+        self._idle = []
+        self._questions = {}  # id(agent) -> questions answered since last reset
+        self._lock = threading.Lock()
+
+    def acquire(self) -> SQLAgent:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return SQLAgent()
+
+    def release(self, agent: SQLAgent):
+        with self._lock:
+            answered = self._questions.get(id(agent), 0) + 1
+            if answered >= self.max_questions or len(agent._messages) > self.max_messages:
+                agent.reset()
+                answered = 0
+            if len(self._idle) < self.size:
+                self._questions[id(agent)] = answered
+                self._idle.append(agent)
+            else:
+                self._questions.pop(id(agent), None)
+
+
 class SupervisorAgent(BaseAgent):
-    def __init__(self):
+    def __init__(self, sql_agent_reuse: str = None, history=None):
         super().__init__(
             system_prompt=SUPERVISOR_SYSTEM_PROMPT,
             tools=SUPERVISOR_TOOLS,
             model="gpt-5-mini",
+            history=history,
         )
         self._last_sql_query = None
+        self._sql_calls_started = 0
+        self._last_sql_call = 0
+
+        reuse = sql_agent_reuse or SQL_AGENT_REUSE
+        if reuse == "fresh":
+            self._sql_agents = None
+        elif reuse == "warm":
+            self._sql_agents = SQLAgentPool(size=1)
+        elif reuse == "pool":
+            self._sql_agents = SQLAgentPool(size=SQL_AGENT_POOL_SIZE)
+        else:
+            raise ValueError(f"Unknown sql_agent_reuse mode: {reuse!r}")
+
+    def _acquire_sql_agent(self) -> SQLAgent:
+        return self._sql_agents.acquire() if self._sql_agents else SQLAgent()
+
+    def _release_sql_agent(self, sql_agent: SQLAgent):
+        if self._sql_agents:
+            self._sql_agents.release(sql_agent)
 
     def execute_tool(self, name: str, args: dict):
         if name == "ask_sql_agent":
-            sql_agent = SQLAgent()
-            result = sql_agent.run(args["question"])
+            sql_agent = self._acquire_sql_agent()
+            try:
+                result = sql_agent.run(args["question"])
+            finally:
+                self._release_sql_agent(sql_agent)
             self._last_sql_query = result.get("sql_query")
             return result["response"]
         else:
             return json.dumps({"error": f"Unknown tool: {name}"})
 
+    async def aexecute_tool(self, name: str, args: dict):
+        if name != "ask_sql_agent":
+            return await super().aexecute_tool(name, args)
+
+        # Concurrent sub-questions can finish in any order; keep the SQL from
+        # the call that comes last in tool_call order so results are deterministic
+        self._sql_calls_started += 1
+        call_index = self._sql_calls_started
+        sql_agent = self._acquire_sql_agent()
+        try:
+            result = await sql_agent.arun(args["question"])
+        finally:
+            self._release_sql_agent(sql_agent)
+        if call_index > self._last_sql_call:
+            self._last_sql_call = call_index
+            self._last_sql_query = result.get("sql_query")
+        return result["response"]
+
     @braintrust.traced(name="supervisor_agent")
     def run(self, user_message: str) -> dict:
         result = super().run(user_message)
         result["sql_query"] = self._last_sql_query
         return result
+
+    @braintrust.traced(name="supervisor_agent")
+    async def arun(self, user_message: str) -> dict:
+        result = await super().arun(user_message)
+        result["sql_query"] = self._last_sql_query
+        return result
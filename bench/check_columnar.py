@@ -0,0 +1,144 @@
+"""Differential check of the columnar executor against SQLite.
+
+Exports a fresh columnar snapshot of the database to a temporary directory and
+runs a query corpus through both ``ColumnarSnapshot.execute`` and SQLite. The
+corpus is every reference query in eval/dataset.json, a sample of generated
+eval queries and the edge cases in ``CORPUS``. Every query the snapshot answers
+must match SQLite exactly: the same column names, rows, row order and value
+types. Queries that fall back to SQLite are listed but always pass. ``CORPUS``
+also runs against a temporary ``--seasons``-season build, where the season
+tables hold several rows per team and player. Exits with status 1 on any
+mismatch.
+
+Usage:
+    python bench/check_columnar.py [--db data/nba.db] [--generated 200] [--seasons 3]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import setup_db
+from eval.generate_dataset import generate_cases
+from tools.columnar import export_snapshot, load_snapshot
+
+DATASET_PATH = os.path.join(ROOT, "eval", "dataset.json")
+DB_PATH = os.path.join(ROOT, "data", "nba.db")
+
+# Shapes at the edge of the whitelist: aliases, joins, grouping, rounding, ties and fallbacks
+CORPUS = [
+    "SELECT ROUND(AVG(points), 2) FROM team_game_stats",
+    "SELECT COUNT(*) FROM games WHERE overtime_periods > 0",
+    "SELECT COUNT(*) AS n FROM games WHERE overtime_periods > 0",
+    "SELECT MAX(points) FROM player_game_stats WHERE points > 1000",
+    "SELECT SUM(points), COUNT(*) FROM player_game_stats WHERE points > 1000",
+    "SELECT COUNT(*) FROM players WHERE position = 'C'",
+    "SELECT name, city FROM teams ORDER BY name",
+    "SELECT name, city FROM teams",
+    "SELECT game_id, points FROM team_game_stats WHERE points >= 140 ORDER BY game_id",
+    "SELECT p.first_name || ' ' || p.last_name, SUM(s.points) AS pts FROM player_game_stats s "
+    "JOIN players p ON s.player_id = p.player_id GROUP BY s.player_id ORDER BY pts DESC LIMIT 5",
+    "SELECT p.first_name || ' ' || p.last_name AS name, ROUND(AVG(s.points), 1) AS ppg, COUNT(*) "
+    "FROM player_game_stats s JOIN players p ON p.player_id = s.player_id GROUP BY p.player_id "
+    "HAVING COUNT(*) >= 10 ORDER BY ppg DESC LIMIT 3",
+    "SELECT t.name, COUNT(*) FROM team_game_stats g JOIN teams t ON g.team_id = t.team_id GROUP BY g.team_id",
+    "SELECT team_id, MAX(points), MIN(points), SUM(rebounds) FROM team_game_stats GROUP BY team_id",
+    "SELECT team_id, ROUND(AVG(fg_percentage), 3) AS fg FROM team_game_stats GROUP BY team_id ORDER BY fg DESC LIMIT 5",
+    "SELECT team_id, ROUND(AVG(fg_percentage), 4) AS fg FROM team_game_stats GROUP BY team_id",
+    "SELECT team_id, AVG(fg_percentage) FROM team_game_stats GROUP BY team_id",
+    "SELECT team_id, COUNT(*) FROM team_game_stats GROUP BY team_id ORDER BY COUNT(*) DESC LIMIT 3",
+    "SELECT t.name, SUM(g.points) AS pts FROM team_game_stats g JOIN teams t ON g.team_id = t.team_id "
+    "WHERE g.points > 100 AND t.conference = 'East' GROUP BY t.team_id ORDER BY pts ASC",
+    "select home_team_id, count(*) as c from games where home_score > away_score group by home_team_id having c > 10",
+    # A name that is both a SELECT alias and a column: SQLite uses the column in HAVING and GROUP BY,
+    # and the alias in ORDER BY
+    "SELECT player_id, SUM(points) AS points FROM player_game_stats GROUP BY player_id "
+    "HAVING points > 700 ORDER BY points DESC LIMIT 3",
+    "SELECT player_id, SUM(points) AS points FROM player_game_stats GROUP BY player_id ORDER BY points DESC LIMIT 3",
+    "SELECT team_id AS player_id, COUNT(*) FROM player_game_stats GROUP BY player_id",
+    "SELECT player_id, SUM(points) AS total FROM player_game_stats GROUP BY player_id HAVING total > 700",
+    "SELECT t.name FROM teams t WHERE t.name = 'Boston Celtics' OR t.city = 'x'",
+    # Season tables key on (team_id, season) or (player_id, season, team_id): one row per season, so team_id
+    # and player_id repeat and are not lookup keys
+    "SELECT COUNT(*) FROM teams t JOIN team_season_records r ON r.team_id = t.team_id",
+    "SELECT COUNT(*) FROM players p JOIN player_season_stats s ON s.player_id = p.player_id",
+    "SELECT t.name, SUM(r.wins) AS wins FROM teams t JOIN team_season_records r ON t.team_id = r.team_id "
+    "GROUP BY t.team_id ORDER BY wins DESC LIMIT 5",
+    "SELECT t.name, SUM(r.wins) AS wins FROM team_season_records r JOIN teams t ON r.team_id = t.team_id "
+    "GROUP BY r.team_id ORDER BY wins DESC LIMIT 5",
+    "SELECT COUNT(*) FROM player_season_stats s JOIN players p ON s.player_id = p.player_id WHERE p.position = 'C'",
+    "SELECT COUNT(*) FROM team_season_shooting h JOIN team_season_records r ON h.team_id = r.team_id",
+    "SELECT COUNT(*), SUM(points) FROM player_game_stats g JOIN player_season_stats s ON g.player_id = s.player_id",
+]
+
+
+def same_result(actual_cursor, expected_cursor) -> bool:
+    columns = [d[0] for d in actual_cursor.description]
+    expected_columns = [d[0] for d in expected_cursor.description]
+    # ResultCursor only implements the fetchmany() that run_sql_query uses
+    rows, expected = actual_cursor.fetchmany(sys.maxsize), expected_cursor.fetchall()
+    return columns == expected_columns and rows == expected and all(
+        type(a) is type(b) for row, expected_row in zip(rows, expected) for a, b in zip(row, expected_row)
+    )
+
+
+def check(db_path: str, queries: list) -> tuple:
+    """Run ``queries`` on a fresh snapshot of ``db_path`` and on SQLite; returns (served, fallbacks, mismatches)."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    served = fallbacks = mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        export_snapshot(db_path, os.path.join(tmp, "columnar"))
+        snapshot = load_snapshot(os.path.join(tmp, "columnar"))
+        for sql in queries:
+            cursor = snapshot.execute(sql)
+            if cursor is None:
+                fallbacks += 1
+                print(f"[fallback] {' '.join(sql.split())[:100]}")
+                continue
+            served += 1
+            if not same_result(cursor, conn.execute(sql)):
+                mismatches += 1
+                print(f"[FAIL] {' '.join(sql.split())}")
+    conn.close()
+    return served, fallbacks, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--generated", type=int, default=200, help="generated eval queries to include")
+    parser.add_argument("--seasons", type=int, default=3, help="also run CORPUS on a build with this many seasons")
+    args = parser.parse_args()
+
+    with open(DATASET_PATH) as f:
+        queries = [case["metadata"]["sql_query"] for case in json.load(f)]
+    if args.generated:
+        queries += [case["metadata"]["sql_query"] for case in generate_cases(args.generated, args.db)]
+    queries += CORPUS
+    queries = list(dict.fromkeys(queries))
+
+    served, fallbacks, mismatches = check(args.db, queries)
+    print(f"\n{args.db}: {len(queries)} queries: {served} answered from the snapshot, "
+          f"{fallbacks} fell back to SQLite, {mismatches} mismatched.\n")
+
+    if args.seasons > 1:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "nba.db")
+            with contextlib.redirect_stdout(None):
+                setup_db.main(db_path, n_seasons=args.seasons)
+            served, fallbacks, failed = check(db_path, CORPUS)
+        mismatches += failed
+        print(f"\n{args.seasons}-season build: {len(CORPUS)} queries: {served} answered from the snapshot, "
+              f"{fallbacks} fell back to SQLite, {failed} mismatched.")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Check that the reference queries in eval/dataset.json use the setup_db.py indexes.
+
+Prints the EXPLAIN QUERY PLAN for every reference query and exits with status 1
+if a query reads player_game_stats or team_game_stats with a full table scan
+when it filters or groups (a bare whole-table aggregate such as
+``AVG(points) FROM team_game_stats`` has to scan either way and is allowed).
+
+Usage:
+    python bench/check_query_plans.py [--db data/nba.db]
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_PATH = os.path.join(ROOT, "eval", "dataset.json")
+DB_PATH = os.path.join(ROOT, "data", "nba.db")
+
+INDEXED_TABLES = ("player_game_stats", "team_game_stats")
+
+
+def table_aliases(sql: str) -> dict:
+    """Map the aliases used in FROM/JOIN clauses (and bare table names) to table names."""
+    aliases = {}
+    for table, alias in re.findall(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|GROUP\b|ORDER\b|JOIN\b)(\w+))?", sql, re.IGNORECASE):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+def needs_index(sql: str) -> bool:
+    return bool(re.search(r"\b(WHERE|GROUP BY|JOIN)\b", sql, re.IGNORECASE))
+
+
+def check_query(conn, sql: str):
+    """Return (plan lines, list of problems) for one query."""
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    aliases = table_aliases(sql)
+    problems = []
+    if needs_index(sql):
+        for line in plan:
+            match = re.match(r"SCAN (\w+)(.*)", line)
+            if not match:
+                continue
+            table = aliases.get(match.group(1), match.group(1))
+            if table in INDEXED_TABLES and "INDEX" not in match.group(2):
+                problems.append(f"full scan of {table}")
+    return plan, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    with open(DATASET_PATH) as f:
+        dataset = json.load(f)
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+
+    failures = 0
+    for case in dataset:
+        plan, problems = check_query(conn, case["metadata"]["sql_query"])
+        status = "FAIL" if problems else "ok"
+        print(f"[{status}] {case['input']}")
+        for line in plan:
+            print(f"         {line}")
+        for problem in problems:
+            print(f"         !! {problem}")
+        failures += bool(problems)
+
+    print(f"\n{len(dataset) - failures}/{len(dataset)} reference queries use the expected indexes.")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""Latency/throughput benchmarks for the SQL tools, agents and data generation.
+
+Agents run against the offline ScriptedBackend, so the numbers measure our own
+orchestration, SQLite and serialization overhead rather than model latency.
+
+Usage:
+    python bench/run_bench.py                     # run all, compare to bench/baseline.json
+    python bench/run_bench.py --only sql,agents   # run a subset
+    python bench/run_bench.py --only setup_db --setup-scales 1,10
+    python bench/run_bench.py --update-baseline   # store this run as the new baseline
+    python bench/run_bench.py --compare-ref HEAD~1  # compare to another commit, run now on this machine
+
+``bench/baseline.json`` is machine-specific: numbers from another machine say
+little about a regression. ``--compare-ref`` checks out a commit in a
+temporary git worktree and builds its database. It then runs this same
+benchmark script against that code and against the working tree, alternating
+for ``--rounds`` rounds, and compares the best p50 of each side. Both numbers
+come from the same machine at the same time. The working-tree side uses
+``data/nba.db``, so rebuild it with ``setup_db.py`` first.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.backends import ScriptedBackend, set_backend
+from agents.sql_agent import SQLAgent
+from agents.supervisor_agent import SupervisorAgent
+from tools.sql_tools import run_sql_query
+
+import setup_db
+
+DATASET_PATH = os.path.join(ROOT, "eval", "dataset.json")
+BASELINE_PATH = os.path.join(ROOT, "bench", "baseline.json")
+OUTPUT_PATH = os.path.join(ROOT, "bench", "results", "latest.json")
+SUITES = ("sql", "agents", "setup_db")
+DEFAULT_SETUP_SCALES = "1,4"
+
+
+def load_dataset():
+    with open(DATASET_PATH) as f:
+        return json.load(f)
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = (len(sorted_values) - 1) * pct / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def summarize(samples):
+    """Summarize per-call durations (seconds) as millisecond percentiles and calls/sec."""
+    values = sorted(samples)
+    total = sum(values)
+    return {
+        "n": len(values),
+        "mean_ms": round(total / len(values) * 1000, 4),
+        "p50_ms": round(percentile(values, 50) * 1000, 4),
+        "p95_ms": round(percentile(values, 95) * 1000, 4),
+        "p99_ms": round(percentile(values, 99) * 1000, 4),
+        "throughput_per_s": round(len(values) / total, 2) if total else None,
+    }
+
+
+def time_calls(func, args_list, iterations):
+    samples = []
+    for _ in range(iterations):
+        for args in args_list:
+            start = time.perf_counter()
+            func(*args)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_sql(dataset, iterations):
+    """Raw run_sql_query latency per reference query (result cache bypassed)."""
+    results = {}
+    for i, case in enumerate(dataset):
+        query = case["metadata"]["sql_query"]
+        run_sql_query(query, use_cache=False)  # warm the connection pool and page cache
+        samples = time_calls(lambda q: run_sql_query(q, use_cache=False), [(query,)], iterations)
+        results[f"sql/case_{i:02d}"] = summarize(samples)
+    all_queries = [(case["metadata"]["sql_query"],) for case in dataset]
+    results["sql/all"] = summarize(time_calls(lambda q: run_sql_query(q, use_cache=False), all_queries, iterations))
+    return results
+
+
+def bench_agents(dataset, iterations):
+    """SQLAgent.run and SupervisorAgent.run end-to-end against the scripted model."""
+    set_backend(ScriptedBackend(latency=0))
+    questions = [(case["input"],) for case in dataset]
+    return {
+        "agents/sql_agent": summarize(time_calls(lambda q: SQLAgent().run(q), questions, iterations)),
+        "agents/sql_agent_no_schema": summarize(
+            time_calls(lambda q: SQLAgent(include_schema=False).run(q), questions, iterations)
+        ),
+        "agents/supervisor": summarize(time_calls(lambda q: SupervisorAgent().run(q), questions, iterations)),
+    }
+
+
+def bench_setup_db(iterations, scales=(1,)):
+    """Full synthetic database build time, per number of seasons generated."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "nba.db")
+        for scale in scales:
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    setup_db.main(db_path=db_path, n_seasons=scale)
+                samples.append(time.perf_counter() - start)
+            results["setup_db/default" if scale == 1 else f"setup_db/seasons_{scale}"] = summarize(samples)
+    return results
+
+
+@contextlib.contextmanager
+def ref_worktree(ref):
+    """A temporary git worktree of ``ref`` with its own database and this benchmark script."""
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = os.path.join(tmp, "worktree")
+        subprocess.run(["git", "-C", ROOT, "worktree", "add", "--detach", worktree, ref],
+                       check=True, capture_output=True, text=True)
+        try:
+            # Same benchmark code on both sides, so only the code under test differs
+            shutil.copy(os.path.abspath(__file__), os.path.join(worktree, "bench", "run_bench.py"))
+            subprocess.run([sys.executable, "setup_db.py"], cwd=worktree, check=True, stdout=subprocess.DEVNULL)
+            yield worktree
+        finally:
+            subprocess.run(["git", "-C", ROOT, "worktree", "remove", "--force", worktree], capture_output=True)
+
+
+def run_script(cwd, argv) -> dict:
+    """Run bench/run_bench.py in ``cwd`` as a fresh process; returns its results."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "results.json")
+        subprocess.run(
+            [sys.executable, "bench/run_bench.py", *argv, "--output", output, "--baseline", os.path.join(tmp, "none")],
+            cwd=cwd, check=True, stdout=subprocess.DEVNULL,
+        )
+        with open(output) as f:
+            return json.load(f)["results"]
+
+
+def best_of(runs):
+    """Per benchmark, the run with the lowest p50; the least disturbed by other load on the machine."""
+    return {name: min((run[name] for run in runs), key=lambda r: r["p50_ms"]) for name in runs[0]}
+
+
+def compare(results, baseline, threshold, min_delta_ms=0.0):
+    """Return a list of (name, baseline p50, current p50, ratio) for regressed benchmarks.
+
+    A benchmark regresses when its p50 is both ``threshold`` slower and at
+    least ``min_delta_ms`` slower. The absolute floor keeps scheduler jitter on
+    sub-millisecond queries from failing the run.
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("p50_ms"):
+            continue
+        ratio = current["p50_ms"] / base["p50_ms"]
+        if ratio > 1 + threshold and current["p50_ms"] - base["p50_ms"] >= min_delta_ms:
+            regressions.append((name, base["p50_ms"], current["p50_ms"], ratio))
+    return regressions
+
+
+def print_table(results, baseline):
+    base_results = baseline.get("results", {}) if baseline else {}
+    print(f"{'benchmark':32} {'n':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>10} {'vs base':>8}")
+    for name, r in results.items():
+        base = base_results.get(name)
+        delta = f"{r['p50_ms'] / base['p50_ms']:.2f}x" if base and base.get("p50_ms") else "-"
+        print(
+            f"{name:32} {r['n']:>5} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {r['p99_ms']:>10.3f} "
+            f"{r['throughput_per_s'] or 0:>10.1f} {delta:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default=",".join(SUITES), help="comma-separated suites to run")
+    parser.add_argument("--iterations", type=int, default=20, help="repetitions per SQL/agent case")
+    parser.add_argument("--setup-iterations", type=int, default=3, help="repetitions of the DB build")
+    parser.add_argument("--setup-scales", default=DEFAULT_SETUP_SCALES,
+                        help="comma-separated season counts to build, e.g. 1,10,100")
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 slowdown before failing")
+    parser.add_argument("--min-delta-ms", type=float, default=0.1,
+                        help="also require this absolute p50 slowdown before failing")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--compare-ref", metavar="REF",
+                        help="compare to a run of git REF on this machine instead of --baseline")
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="with --compare-ref: alternating runs of each side; the best p50 of each is compared")
+    args = parser.parse_args()
+
+    suites = [s for s in args.only.split(",") if s]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+    if args.compare_ref and args.update_baseline:
+        parser.error("--compare-ref and --update-baseline cannot be combined")
+
+    baseline = None
+    if args.compare_ref:
+        # Both sides run as fresh processes, alternating, so load drifts hit them alike
+        argv = ["--only", args.only, "--iterations", str(args.iterations),
+                "--setup-iterations", str(args.setup_iterations), "--setup-scales", args.setup_scales]
+        ref_runs, current_runs = [], []
+        with ref_worktree(args.compare_ref) as worktree:
+            for i in range(args.rounds):
+                print(f"Round {i + 1}/{args.rounds}: {args.compare_ref}, then the working tree")
+                ref_runs.append(run_script(worktree, argv))
+                current_runs.append(run_script(ROOT, argv))
+        baseline = {"results": best_of(ref_runs)}
+        results = best_of(current_runs)
+    else:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        dataset = load_dataset()
+        results = {}
+        if "sql" in suites:
+            results.update(bench_sql(dataset, args.iterations))
+        if "agents" in suites:
+            results.update(bench_agents(dataset, args.iterations))
+        if "setup_db" in suites:
+            scales = [int(n) for n in args.setup_scales.split(",") if n]
+            results.update(bench_setup_db(args.setup_iterations, scales))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "setup_scales": args.setup_scales,
+            "compare_ref": args.compare_ref,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_table(results, baseline)
+    print(f"\nResults written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    if baseline:
+        against = args.compare_ref or "baseline"
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%} against {against}:")
+            for name, base, current, ratio in regressions:
+                print(f"  {name}: p50 {base:.3f} ms -> {current:.3f} ms ({ratio:.2f}x)")
+            sys.exit(1)
+        print(f"\nNo regressions against {against}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,31 @@
 """CLI chat interface for the NBA analytics agent."""
 
+import os
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from agents.history import HistoryManager
 from agents.supervisor_agent import SupervisorAgent
 
 
 def main():
     print("NBA Analytics Chat  |  type 'quit' to exit\n")
-    agent = SupervisorAgent()
+    # Keep a warm SQL agent so follow-up questions reuse earlier context (unless
+    # SQL_AGENT_REUSE says otherwise), and compact old turns so long sessions
+    # don't resend every raw tool output
+    history = HistoryManager()
+    agent = SupervisorAgent(sql_agent_reuse=os.environ.get("SQL_AGENT_REUSE", "warm"), history=history)
 
     while True:
         user_input = input("You >> ").strip()
         if not user_input:
             continue
         if user_input.lower() in ("quit", "exit", "q"):
+            if history.metrics["compactions"]:
+                print(f"History compacted {history.metrics['compactions']} times, "
+                      f"saving ~{history.metrics['tokens_saved']} tokens.")
             break
 
         result = agent.run(user_input)
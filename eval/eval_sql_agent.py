@@ -3,9 +3,10 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from braintrust import Eval, init_dataset, init_function
+from braintrust import Eval, init_dataset
 
 from agents.sql_agent import SQLAgent
+from eval.scorers import data_eval, sql_eval
 
 from dotenv import load_dotenv
 
@@ -17,7 +18,7 @@ Eval(
     PROJECT, 
     data=init_dataset(project=PROJECT, name="sql-agent-eval"),
     task=lambda input: SQLAgent().run(input),
-    scores=[init_function(project_name=PROJECT, slug="data_eval"),
-            init_function(project_name=PROJECT, slug="sql_eval")],
+    # Local deterministic scorers; sql_eval only calls an LLM judge for ambiguous result sets
+    scores=[data_eval, sql_eval],
     max_concurrency=5,
 )
\ No newline at end of file
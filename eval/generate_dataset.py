@@ -0,0 +1,137 @@
+"""Generate larger eval datasets from question templates over data/nba.db.
+
+Each case has the same shape as ``eval/dataset.json``: ``input``, ``expected``
+(``values``/``strings``) and ``metadata.sql_query``. Expected answers come from
+running the reference SQL, so a generated dataset matches the database it was
+generated from. Use the default single-season build for "this season" wording.
+
+Usage:
+    python eval/generate_dataset.py --cases 1000 --output data/eval_1000.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(ROOT, "data", "nba.db")
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _player_cases(conn):
+    # Full names that map to a single player, so the question is unambiguous
+    players = conn.execute(
+        "SELECT first_name, last_name FROM players GROUP BY first_name, last_name HAVING COUNT(*) = 1 "
+        "ORDER BY first_name, last_name"
+    ).fetchall()
+    for first, last in players:
+        where = f"p.first_name = {_quote(first)} AND p.last_name = {_quote(last)}"
+        name = f"{first} {last}"
+        yield (
+            "player_points",
+            f"How many total points did {name} score this season?",
+            f"SELECT SUM(pgs.points) AS total_points FROM player_game_stats pgs "
+            f"JOIN players p ON pgs.player_id = p.player_id WHERE {where}",
+            [],
+        )
+        yield (
+            "player_rebounds",
+            f"How many rebounds per game does {name} average this season?",
+            f"SELECT ROUND(AVG(pgs.rebounds), 2) AS rebounds_per_game FROM player_game_stats pgs "
+            f"JOIN players p ON pgs.player_id = p.player_id WHERE {where}",
+            [],
+        )
+
+
+def _team_cases(conn):
+    for name, city in conn.execute("SELECT name, city FROM teams ORDER BY team_id").fetchall():
+        yield (
+            "team_home_wins",
+            f"How many home games did the {city} {name} win this season?",
+            f"SELECT COUNT(*) AS home_wins FROM games g JOIN teams t ON g.home_team_id = t.team_id "
+            f"WHERE t.name = {_quote(name)} AND g.home_score > g.away_score",
+            [],
+        )
+        yield (
+            "team_top_scorer",
+            f"Who is the {city} {name}'s leading scorer by total points this season?",
+            f"SELECT p.first_name || ' ' || p.last_name AS player, SUM(pgs.points) AS total_points "
+            f"FROM player_game_stats pgs JOIN players p ON pgs.player_id = p.player_id "
+            f"JOIN teams t ON pgs.team_id = t.team_id WHERE t.name = {_quote(name)} "
+            f"GROUP BY pgs.player_id ORDER BY total_points DESC LIMIT 2",
+            ["player"],
+        )
+
+
+def _date_cases(conn):
+    for (date,) in conn.execute("SELECT DISTINCT game_date FROM games ORDER BY game_date").fetchall():
+        yield (
+            "games_on_date",
+            f"How many games were played on {date}?",
+            f"SELECT COUNT(*) AS games FROM games WHERE game_date = {_quote(date)}",
+            [],
+        )
+
+
+def _expected(conn, template: str, sql: str, string_columns: list):
+    """Run the reference SQL and turn its answer into ``expected``; None if the answer is ambiguous."""
+    cur = conn.execute(sql)
+    columns = [d[0] for d in cur.description]
+    rows = cur.fetchall()
+    if not rows or rows[0][-1] is None:
+        return None, sql
+    if template == "team_top_scorer":
+        # LIMIT 2 only to detect a tie for first; the stored query keeps LIMIT 1
+        if len(rows) > 1 and rows[1][-1] == rows[0][-1]:
+            return None, sql
+        sql = sql[: -len("LIMIT 2")] + "LIMIT 1"
+    row = dict(zip(columns, rows[0]))
+    return {
+        "values": [v for k, v in row.items() if k not in string_columns],
+        "strings": [row[k] for k in string_columns],
+    }, sql
+
+
+def generate_cases(n_cases: int, db_path: str = DB_PATH, seed: int = 0) -> list:
+    """Return ``n_cases`` template cases in seeded random order; templates repeat once all are used."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        candidates = list(_player_cases(conn)) + list(_team_cases(conn)) + list(_date_cases(conn))
+        random.Random(seed).shuffle(candidates)
+        cases = []
+        for template, question, sql, string_columns in candidates:
+            expected, sql = _expected(conn, template, sql, string_columns)
+            if expected is not None:
+                cases.append({
+                    "input": question,
+                    "expected": expected,
+                    "metadata": {"sql_query": sql, "template": template},
+                })
+    finally:
+        conn.close()
+    if not cases:
+        raise ValueError(f"No cases could be generated from {db_path}")
+    return [cases[i % len(cases)] for i in range(n_cases)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a larger eval dataset from question templates.")
+    parser.add_argument("--cases", type=int, default=1000)
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(ROOT, "data", "eval_generated.json"))
+    args = parser.parse_args()
+
+    cases = generate_cases(args.cases, args.db_path, args.seed)
+    with open(args.output, "w") as f:
+        json.dump(cases, f, indent=2)
+    print(f"Wrote {len(cases)} cases ({len({c['input'] for c in cases})} distinct) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Stored reference-query results for eval ground truth.
+
+Each reference query (``metadata.sql_query`` of a dataset case) is run once
+per database version. Its columns and rows are kept in ``ground_truth.db``
+next to the database, keyed by a hash of the normalized SQL plus a database
+key. Scorers and ``setup_db.compute_ground_truth`` read from the store, so
+re-scoring a dataset does no work on ``nba.db`` once the store is built.
+
+The database key covers the file identity, size, mtime and
+``PRAGMA user_version``. Unlike the in-process pool fingerprint it has to
+survive restarts, and a rebuilt file can reuse an inode. Any rewrite
+invalidates the stored results, including an ``ANALYZE`` or ``VACUUM``,
+which errs on the safe side.
+
+Usage:
+    python eval/ground_truth.py                                 # eval/dataset.json
+    python eval/ground_truth.py --dataset data/eval_5000.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from tools.query_cache import normalize_sql
+
+DB_PATH = os.path.join(ROOT, "data", "nba.db")
+DATASET_PATH = os.path.join(ROOT, "eval", "dataset.json")
+GROUND_TRUTH_TIMEOUT = float(os.environ.get("GROUND_TRUTH_TIMEOUT", "60"))
+GROUND_TRUTH_MAX_ROWS = int(os.environ.get("GROUND_TRUTH_MAX_ROWS", "10000"))
+
+
+def query_hash(sql: str) -> str:
+    """Hash of the normalized query, so whitespace and keyword case do not matter."""
+    return hashlib.sha256(normalize_sql(sql).encode()).hexdigest()
+
+
+def database_key(db_path: str = DB_PATH) -> str:
+    """Identify the database contents across processes and restarts."""
+    st = os.stat(db_path)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+    identity = [os.path.realpath(db_path), st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, user_version]
+    return hashlib.sha256(json.dumps(identity).encode()).hexdigest()[:32]
+
+
+class GroundTruthStore:
+    """Reference results keyed by (query hash, database key), backed by SQLite with an in-memory layer."""
+
+    def __init__(self, db_path: str = DB_PATH, path: str = None):
+        self.db_path = db_path
+        self.path = path or os.path.join(os.path.dirname(os.path.abspath(db_path)), "ground_truth.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ground_truth (
+                query_hash TEXT,
+                db_key TEXT,
+                db_path TEXT,
+                sql TEXT,
+                columns TEXT,
+                rows TEXT,
+                error TEXT,
+                created_at REAL,
+                PRIMARY KEY (query_hash, db_key)
+            )
+        """)
+        self._conn.commit()
+        self._stat = None
+        self._db_key = None
+        self._memory = {}  # (query hash, db key) -> result
+        self.hits = 0
+        self.computed = 0
+
+    def current_key(self) -> str:
+        """The database key, re-read only when the file's stat changes."""
+        st = os.stat(self.db_path)
+        stat = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        if stat != self._stat:
+            self._db_key = database_key(self.db_path)
+            self._stat = stat
+        return self._db_key
+
+    def _execute(self, sql: str) -> dict:
+        deadline = time.monotonic() + GROUND_TRUTH_TIMEOUT
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, 10_000)
+        try:
+            cur = conn.execute(sql)
+            columns = [d[0] for d in cur.description] if cur.description else []
+            rows = cur.fetchmany(GROUND_TRUTH_MAX_ROWS + 1)
+        except sqlite3.Error as e:
+            return {"columns": [], "rows": [], "error": str(e)}
+        finally:
+            conn.close()
+        if len(rows) > GROUND_TRUTH_MAX_ROWS:
+            return {"columns": columns, "rows": [], "error": f"more than {GROUND_TRUTH_MAX_ROWS} rows"}
+        return {"columns": columns, "rows": [list(row) for row in rows], "error": None}
+
+    def get(self, sql: str):
+        """Stored result for ``sql`` on the current database, or None."""
+        key = (query_hash(sql), self.current_key())
+        with self._lock:
+            result = self._memory.get(key)
+            if result is None:
+                row = self._conn.execute(
+                    "SELECT columns, rows, error FROM ground_truth WHERE query_hash = ? AND db_key = ?", key
+                ).fetchone()
+                if row is None:
+                    return None
+                result = {"columns": json.loads(row[0]), "rows": json.loads(row[1]), "error": row[2]}
+                self._memory[key] = result
+            self.hits += 1
+            return result
+
+    def result(self, sql: str) -> dict:
+        """``{"columns", "rows", "error"}`` for ``sql``, running it only if it is not stored yet."""
+        result = self.get(sql)
+        if result is not None:
+            return result
+        key = (query_hash(sql), self.current_key())
+        result = self._execute(sql)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ground_truth VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, os.path.realpath(self.db_path), sql, json.dumps(result["columns"]),
+                 json.dumps(result["rows"]), result["error"], time.time()),
+            )
+            self._conn.commit()
+            self._memory[key] = result
+            self.computed += 1
+        return result
+
+    def build(self, cases: list) -> dict:
+        """Store every case's reference result and drop entries for older versions of this database."""
+        computed_before, hits_before = self.computed, self.hits
+        for case in cases:
+            sql = (case.get("metadata") or {}).get("sql_query")
+            if sql:
+                self.result(sql)
+        with self._lock:
+            pruned = self._conn.execute(
+                "DELETE FROM ground_truth WHERE db_path = ? AND db_key != ?",
+                (os.path.realpath(self.db_path), self.current_key()),
+            ).rowcount
+            self._conn.commit()
+        return {"computed": self.computed - computed_before, "reused": self.hits - hits_before, "pruned": pruned}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(db_path: str = DB_PATH) -> GroundTruthStore:
+    """Shared store for a database, created on first use."""
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = _stores[db_path] = GroundTruthStore(db_path)
+        return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the ground-truth store for a dataset's reference queries.")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--db-path", default=DB_PATH)
+    args = parser.parse_args()
+
+    with open(args.dataset) as f:
+        cases = json.load(f)
+    store = GroundTruthStore(args.db_path)
+    stats = store.build(cases)
+    store.close()
+    print(f"{len(cases)} cases: {stats['computed']} reference queries run, {stats['reused']} already stored, "
+          f"{stats['pruned']} stale entries dropped ({store.path})")
+
+
+if __name__ == "__main__":
+    main()
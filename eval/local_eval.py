@@ -0,0 +1,402 @@
+"""Local parallel eval runner.
+
+Runs SQLAgent or SupervisorAgent over ``eval/dataset.json`` (or a dataset from
+``eval/generate_dataset.py``) in a thread or process pool with a per-case
+timeout. Each result is streamed to a JSONL file, or a SQLite database for
+``.db``/``.sqlite`` paths, as soon as it completes. The run ends with wall
+time, per-case latency percentiles, throughput and mean scores.
+
+With ``--incremental``, each case is fingerprinted on its own content, on
+everything the agent sees (system prompts, models, tool schemas, LLM backend
+and database version) and on the scorers' source. Results of earlier runs
+with the same fingerprint are reused from ``data/eval_cache.db``, and only new
+or invalidated cases run.
+
+Usage:
+    python eval/local_eval.py                                       # dataset.json, 4 threads
+    python eval/local_eval.py --agent supervisor --workers 8 --timeout 60
+    LLM_BACKEND=scripted python eval/local_eval.py --generate 5000 --executor process
+    python eval/local_eval.py --results data/eval_results.db        # SQLite results store
+    python eval/local_eval.py --incremental                         # re-run only changed cases
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from agents import backends
+from agents.sql_agent import SQLAgent
+from agents.supervisor_agent import SupervisorAgent
+from bench.run_bench import summarize
+from eval.generate_dataset import generate_cases
+from eval.ground_truth import database_key
+from eval.scorers import data_eval, sql_eval
+from tools.sql_tools import DB_PATH
+
+DATASET_PATH = os.path.join(ROOT, "eval", "dataset.json")
+RESULTS_PATH = os.path.join(ROOT, "data", "eval_results.jsonl")
+EVAL_CACHE_PATH = os.environ.get("EVAL_CACHE_PATH", os.path.join(ROOT, "data", "eval_cache.db"))
+AGENTS = {"sql": SQLAgent, "supervisor": SupervisorAgent}
+SCORERS = [data_eval, sql_eval]
+POLL_INTERVAL = 0.05
+
+
+def load_cases(path: str = DATASET_PATH) -> list:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _init_worker(reference_sql: dict):
+    # The scripted model answers from each case's reference SQL, so generated datasets work offline too
+    if backends.LLM_BACKEND == "scripted":
+        backends.set_backend(backends.ScriptedBackend(sql_for=reference_sql))
+
+
+def run_case(agent: str, case: dict, agent_kwargs: dict = None) -> dict:
+    """Run one case (agent call, then scorers) inside a pool worker."""
+    start = time.perf_counter()
+    try:
+        instance = AGENTS[agent](**(agent_kwargs or {}))
+        output = instance.run(case["input"])
+    except Exception as e:
+        return {"status": "error", "latency_s": time.perf_counter() - start, "error": f"{type(e).__name__}: {e}"}
+    latency = time.perf_counter() - start
+
+    scores, score_metadata = {}, {}
+    for scorer in SCORERS:
+        result = scorer(input=case["input"], output=output, expected=case.get("expected"),
+                        metadata=case.get("metadata"))
+        scores[result["name"]] = result["score"]
+        score_metadata[result["name"]] = result.get("metadata")
+    return {"status": "ok", "latency_s": latency, "output": output, "scores": scores,
+            "score_metadata": score_metadata, "usage": instance.usage}
+
+
+class ResultStore:
+    """Streams run metadata, per-case results and the final summary to JSONL or SQLite."""
+
+    def __init__(self, path: str, run_id: str, config: dict):
+        self.path = path
+        self.run_id = run_id
+        self.sqlite = path.endswith((".db", ".sqlite"))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if self.sqlite:
+            self._conn = sqlite3.connect(path)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS eval_runs (
+                    run_id TEXT PRIMARY KEY,
+                    started_at TEXT,
+                    config TEXT,
+                    summary TEXT
+                );
+                CREATE TABLE IF NOT EXISTS eval_results (
+                    run_id TEXT,
+                    case_index INTEGER,
+                    input TEXT,
+                    status TEXT,
+                    latency_s REAL,
+                    scores TEXT,
+                    output TEXT,
+                    error TEXT,
+                    PRIMARY KEY (run_id, case_index)
+                );
+            """)
+            self._conn.execute(
+                "INSERT INTO eval_runs (run_id, started_at, config) VALUES (?, ?, ?)",
+                (run_id, datetime.now(timezone.utc).isoformat(), json.dumps(config)),
+            )
+            self._conn.commit()
+        else:
+            self._file = open(path, "a")
+            self._write({"type": "run", "started_at": datetime.now(timezone.utc).isoformat(), "config": config})
+
+    def _write(self, record: dict):
+        self._file.write(json.dumps({"run_id": self.run_id, **record}, default=str) + "\n")
+        self._file.flush()
+
+    def add(self, record: dict):
+        if self.sqlite:
+            self._conn.execute(
+                "INSERT INTO eval_results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.run_id, record["index"], record["input"], record["status"], record.get("latency_s"),
+                    json.dumps(record.get("scores")), json.dumps(record.get("output"), default=str),
+                    record.get("error"),
+                ),
+            )
+            self._conn.commit()
+        else:
+            self._write({"type": "result", **record})
+
+    def finish(self, summary: dict):
+        if self.sqlite:
+            self._conn.execute("UPDATE eval_runs SET summary = ? WHERE run_id = ?", (json.dumps(summary), self.run_id))
+            self._conn.commit()
+            self._conn.close()
+        else:
+            self._write({"type": "summary", **summary})
+            self._file.close()
+
+
+def run_fingerprint(agent: str, db_path: str = DB_PATH, agent_kwargs: dict = None) -> dict:
+    """Inputs shared by every case of a run; a change to any of them invalidates stored results."""
+    instances = [AGENTS[agent](**(agent_kwargs or {}))]
+    if agent == "supervisor":
+        instances.append(SQLAgent())  # the agent ask_sql_agent delegates to
+    return {
+        "agent": agent,
+        "backend": backends.LLM_BACKEND,
+        # system_prompt includes the schema catalog section, so schema changes count too
+        "agents": [{"system_prompt": a.system_prompt, "model": a.model, "tools": a.tools} for a in instances],
+        "database": database_key(db_path),
+        "scorers": {scorer.__name__: _module_hash(scorer) for scorer in SCORERS},
+    }
+
+
+def _module_hash(func) -> str:
+    # The whole module, since scorers lean on shared helpers (compare_results, cells_equal, ...)
+    return hashlib.sha256(inspect.getsource(inspect.getmodule(func)).encode()).hexdigest()[:16]
+
+
+def case_fingerprint(run: dict, case: dict) -> str:
+    canonical = json.dumps({"run": run, "case": case}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class CaseCache:
+    """Completed case results keyed by fingerprint, reused by ``--incremental`` runs.
+
+    Only ``ok`` results are stored; errors and timeouts run again next time.
+    """
+
+    def __init__(self, path: str = EVAL_CACHE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS case_results (
+                fingerprint TEXT PRIMARY KEY,
+                input TEXT,
+                latency_s REAL,
+                output TEXT,
+                scores TEXT,
+                score_metadata TEXT,
+                created_at TEXT,
+                usage TEXT
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, fingerprint: str):
+        row = self._conn.execute(
+            "SELECT latency_s, output, scores, score_metadata, usage FROM case_results WHERE fingerprint = ?",
+            (fingerprint,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"status": "ok", "latency_s": row[0], "output": json.loads(row[1]), "scores": json.loads(row[2]),
+                "score_metadata": json.loads(row[3]), "usage": json.loads(row[4]) if row[4] else None}
+
+    def put(self, fingerprint: str, result: dict):
+        if result["status"] != "ok":
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO case_results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                fingerprint, result["input"], result["latency_s"], json.dumps(result["output"], default=str),
+                json.dumps(result["scores"]), json.dumps(result["score_metadata"], default=str),
+                datetime.now(timezone.utc).isoformat(), json.dumps(result.get("usage")),
+            ),
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+def run_eval(cases: list, agent: str = "sql", executor: str = "thread", workers: int = 4,
+             timeout: float = 120.0, on_result=None, cache: CaseCache = None, agent_kwargs: list = None) -> tuple:
+    """Run every case through ``agent``; returns ``(results in case order, wall seconds)``.
+
+    At most ``workers`` cases are in flight. A case still running ``timeout``
+    seconds after it started is recorded as a timeout and its eventual result
+    is discarded. The call itself is not interrupted, so a hung worker slot
+    stays busy until it returns.
+
+    ``agent_kwargs`` optionally gives constructor kwargs per case (e.g. a
+    ``system_prompt`` or ``model``), so one run can cover several agent
+    configurations. With a ``cache``, cases whose fingerprint is stored are
+    recorded from it (``reused: True``) without running, and new ``ok``
+    results are stored.
+    """
+    agent_kwargs = agent_kwargs or [None] * len(cases)
+    fingerprints = [None] * len(cases)
+    if cache is not None:
+        runs = {}  # one fingerprint (and agent instance) per distinct configuration
+        for i, (case, kwargs) in enumerate(zip(cases, agent_kwargs)):
+            config = json.dumps(kwargs, sort_keys=True)
+            if config not in runs:
+                runs[config] = run_fingerprint(agent, agent_kwargs=kwargs)
+            fingerprints[i] = case_fingerprint(runs[config], case)
+    reference_sql = {case["input"]: case.get("metadata", {}).get("sql_query") for case in cases}
+    if executor == "process":
+        # spawn: the agent modules hold thread pools and clients that should not be forked
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(reference_sql,))
+    else:
+        _init_worker(reference_sql)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="eval-case")
+
+    results = [None] * len(cases)
+    pending = {}  # future -> case index
+    started = {}  # future -> first time it was seen running
+    next_index = 0
+    timed_out = False
+
+    def record(index, result, reused=False):
+        result = {"index": index, "input": cases[index]["input"], **result}
+        if cache is not None:
+            result["reused"] = reused
+            if not reused:
+                cache.put(fingerprints[index], result)
+        results[index] = result
+        if on_result is not None:
+            on_result(result)
+
+    start = time.perf_counter()
+    try:
+        while pending or next_index < len(cases):
+            while next_index < len(cases) and len(pending) < workers:
+                stored = cache.get(fingerprints[next_index]) if cache is not None else None
+                if stored is not None:
+                    record(next_index, stored, reused=True)
+                else:
+                    pending[pool.submit(run_case, agent, cases[next_index], agent_kwargs[next_index])] = next_index
+                next_index += 1
+            if not pending:
+                continue
+            done, _ = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            now = time.perf_counter()
+            for future in done:
+                index = pending.pop(future)
+                started.pop(future, None)
+                try:
+                    record(index, future.result())
+                except Exception as e:  # the worker process died or the result did not unpickle
+                    record(index, {"status": "error", "latency_s": None, "error": f"{type(e).__name__}: {e}"})
+            for future, index in list(pending.items()):
+                if future.running():
+                    started.setdefault(future, now)
+                if future in started and now - started[future] > timeout:
+                    del pending[future]
+                    del started[future]
+                    timed_out = True
+                    record(index, {"status": "timeout", "latency_s": now - started.get(future, now),
+                                   "error": f"no result after {timeout:g}s"})
+    finally:
+        pool.shutdown(wait=not timed_out, cancel_futures=True)
+    return results, time.perf_counter() - start
+
+
+def summarize_run(results: list, wall_s: float) -> dict:
+    statuses = [r["status"] for r in results]
+    # Latency and throughput describe this run; stored latencies of reused cases are reported apart
+    latencies = [r["latency_s"] for r in results if r["status"] == "ok" and not r.get("reused")]
+    reused_latencies = [r["latency_s"] for r in results if r.get("reused")]
+    score_names = sorted({name for r in results for name in (r.get("scores") or {})})
+    reused = sum(1 for r in results if r.get("reused"))
+    executed = len(results) - reused
+    return {
+        "cases": len(results),
+        "reused": reused if any("reused" in r for r in results) else None,
+        "ok": statuses.count("ok"),
+        "errors": statuses.count("error"),
+        "timeouts": statuses.count("timeout"),
+        "wall_s": round(wall_s, 3),
+        "throughput_per_s": round(executed / wall_s, 2) if wall_s and executed else None,
+        "latency": summarize(latencies) if latencies else None,
+        "reused_latency": summarize(reused_latencies) if reused_latencies else None,
+        "scores": {name: _mean_score(results, name) for name in score_names},
+    }
+
+
+def _mean_score(results: list, name: str):
+    # Errors and timeouts count as 0; a None score (case could not be scored) is left out
+    scores = [(r.get("scores") or {}).get(name, 0) if r["status"] == "ok" else 0 for r in results]
+    scores = [score for score in scores if score is not None]
+    return round(sum(scores) / len(scores), 4) if scores else None
+
+
+def print_summary(summary: dict):
+    print(f"cases: {summary['cases']}  ok: {summary['ok']}  errors: {summary['errors']}  "
+          f"timeouts: {summary['timeouts']}")
+    if summary["reused"] is not None:
+        print(f"reused: {summary['reused']}  recomputed: {summary['cases'] - summary['reused']}")
+    throughput = summary["throughput_per_s"]
+    print(f"wall: {summary['wall_s']:.2f}s  throughput: {throughput if throughput is not None else '-'} cases/s")
+    for label, latency in (("latency ms", summary["latency"]), ("reused cases, stored latency ms",
+                                                                   summary["reused_latency"])):
+        if latency:
+            print(f"{label}: mean {latency['mean_ms']:.1f}  p50 {latency['p50_ms']:.1f}  "
+                  f"p95 {latency['p95_ms']:.1f}  p99 {latency['p99_ms']:.1f}")
+    for name, score in summary["scores"].items():
+        print(f"{name}: {score:.2%}" if score is not None else f"{name}: -")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the eval dataset locally in a thread or process pool.")
+    parser.add_argument("--agent", choices=sorted(AGENTS), default="sql")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--generate", type=int, metavar="N", help="use N generated template cases instead")
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    parser.add_argument("--workers", type=int, default=4, help="cases in flight at once")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds per case")
+    parser.add_argument("--results", default=RESULTS_PATH, help=".jsonl, or .db/.sqlite for a SQLite store")
+    parser.add_argument("--incremental", action="store_true",
+                        help="reuse stored results for cases whose inputs, prompts, models, tools and DB are unchanged")
+    parser.add_argument("--cache", default=EVAL_CACHE_PATH, help="case result store for --incremental")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    cases = generate_cases(args.generate) if args.generate else load_cases(args.dataset)
+    config = {
+        "agent": args.agent, "dataset": "generated" if args.generate else args.dataset, "cases": len(cases),
+        "executor": args.executor, "workers": args.workers, "timeout": args.timeout,
+        "backend": backends.LLM_BACKEND, "incremental": args.incremental,
+    }
+    run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{os.getpid()}"
+    store = ResultStore(args.results, run_id, config)
+    print(f"Run {run_id}: {len(cases)} cases, {args.agent} agent, {args.workers} {args.executor} workers")
+
+    cache = CaseCache(args.cache) if args.incremental else None
+    results, wall_s = run_eval(cases, args.agent, args.executor, args.workers, args.timeout, on_result=store.add,
+                               cache=cache)
+    if cache is not None:
+        cache.close()
+    summary = summarize_run(results, wall_s)
+    store.finish(summary)
+    print_summary(summary)
+    print(f"Results: {args.results}")
+
+
+if __name__ == "__main__":
+    main()
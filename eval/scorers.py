@@ -0,0 +1,242 @@
+"""Deterministic scorers for evals.
+
+Scorers follow the Braintrust signature: keyword arguments ``input``,
+``output``, ``expected`` and ``metadata``, and a ``{"name", "score",
+"metadata"}`` dict as the result, so they work both in ``braintrust.Eval`` and
+in ``eval/local_eval.py``.
+
+``data_eval`` looks for the expected values and strings in the response text.
+``sql_eval`` runs the agent's SQL and the reference SQL against the database
+and compares the result sets, ignoring row and column order and tolerating
+float rounding. Reference results are read from ``eval/ground_truth.py``'s
+store. Only an ambiguous comparison goes to an LLM judge: extra rows
+around the reference rows, or a subset of the reference columns.
+"""
+
+import itertools
+import json
+import math
+import os
+import re
+import time
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+from agents import backends
+from eval.ground_truth import get_store
+from tools.sql_tools import DB_PATH, get_pool
+
+NUMBER = re.compile(r"-?\d[\d,]*(?:\.\d+)?")
+
+SQL_EVAL_TIMEOUT = float(os.environ.get("SQL_EVAL_TIMEOUT", "10"))
+SQL_EVAL_MAX_ROWS = int(os.environ.get("SQL_EVAL_MAX_ROWS", "10000"))
+# Ambiguous comparisons go to this model when LLM_BACKEND=openai; set SQL_EVAL_JUDGE=0 to never call it
+SQL_EVAL_JUDGE = os.environ.get("SQL_EVAL_JUDGE", "1") != "0"
+SQL_EVAL_JUDGE_MODEL = os.environ.get("SQL_EVAL_JUDGE_MODEL", "gpt-4o-mini")
+MAX_COLUMN_MAPPINGS = 1000
+
+
+def _rounded(value: Decimal, places: int) -> Decimal:
+    return value.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+
+def _places(value: Decimal) -> int:
+    return max(0, -value.as_tuple().exponent)
+
+
+def _equal_at_shared_precision(expected: Decimal, actual: Decimal, actual_places: int) -> bool:
+    expected_places = _places(expected)
+    shared = min(expected_places, actual_places)
+    if expected_places and not shared:
+        shared = 1
+    return _rounded(actual, shared) == _rounded(expected, shared)
+
+
+def _number_present(value, numbers: list) -> bool:
+    """True if a number in the response equals ``value`` at the precision both sides share.
+
+    ``115.9`` matches an expected ``115.91``, and ``48.4`` (a percentage) matches
+    ``0.484``. Non-integers are compared to at least one decimal, so ``0``
+    does not match ``0.484``.
+    """
+    expected = Decimal(repr(value)).normalize()
+    for text in numbers:
+        number = Decimal(text.replace(",", ""))
+        candidates = [(number, _places(number))]
+        if abs(expected) < 1 <= abs(number) <= 100:
+            candidates.append((number / 100, _places(number) + 2))
+        if any(_equal_at_shared_precision(expected, c, places) for c, places in candidates):
+            return True
+    return False
+
+
+def data_eval(input=None, output=None, expected=None, metadata=None) -> dict:
+    """1 if every expected value and string appears in the response text, else 0."""
+    response = output.get("response") if isinstance(output, dict) else output
+    response = response or ""
+    expected = expected or {}
+    numbers = NUMBER.findall(response)
+    missing = [v for v in expected.get("values", []) if not _number_present(v, numbers)]
+    missing += [s for s in expected.get("strings", []) if s.lower() not in response.lower()]
+    return {"name": "data_eval", "score": 0 if missing else 1, "metadata": {"missing": missing}}
+
+
+# ---------------------------------------------------------------------------
+# Execution-based SQL comparison
+# ---------------------------------------------------------------------------
+def execute_sql(sql: str) -> list:
+    """Run a query on the shared read-only pool with a time and row limit."""
+    deadline = time.monotonic() + SQL_EVAL_TIMEOUT
+    with get_pool().connection() as conn:
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, 10_000)
+        try:
+            rows = conn.execute(sql).fetchmany(SQL_EVAL_MAX_ROWS + 1)
+        finally:
+            conn.set_progress_handler(None, 0)
+    if len(rows) > SQL_EVAL_MAX_ROWS:
+        raise ValueError(f"query returned more than {SQL_EVAL_MAX_ROWS} rows")
+    return rows
+
+
+def cells_equal(expected, actual) -> bool:
+    """Compare two result cells: strings case-insensitively, numbers at their shared precision."""
+    if isinstance(expected, str) or isinstance(actual, str):
+        return isinstance(expected, str) and isinstance(actual, str) and expected.strip().lower() == actual.strip().lower()
+    if expected is None or actual is None:
+        return expected is None and actual is None
+    if expected == actual or math.isclose(expected, actual, rel_tol=1e-9):
+        return True
+    if isinstance(expected, float) or isinstance(actual, float):
+        actual_dec = Decimal(repr(actual)).normalize()
+        return _equal_at_shared_precision(Decimal(repr(expected)).normalize(), actual_dec, _places(actual_dec))
+    return False
+
+
+def _text_key(value):
+    return value.strip().lower() if isinstance(value, str) else None
+
+
+def _rows_contained(expected_rows: list, actual_rows: list, mapping: dict) -> bool:
+    """True if every expected row matches a distinct actual row on the mapped columns."""
+    # Bucket actual rows by their text cells so each expected row only scans plausible matches
+    key_cols = [c for c in mapping if all(isinstance(row[c], str) for row in expected_rows)]
+    buckets = defaultdict(list)
+    for i, row in enumerate(actual_rows):
+        buckets[tuple(_text_key(row[mapping[c]]) for c in key_cols)].append(i)
+    used = set()
+    for row in expected_rows:
+        for i in buckets.get(tuple(_text_key(row[c]) for c in key_cols), ()):
+            if i not in used and all(cells_equal(row[c], actual_rows[i][mapping[c]]) for c in mapping):
+                used.add(i)
+                break
+        else:
+            return False
+    return True
+
+
+def compare_results(expected_rows: list, actual_rows: list) -> str:
+    """Classify the agent's rows against the reference rows.
+
+    ``match``: same rows, in any order, with the reference columns found among
+    the agent's columns (extra columns are fine). ``superset``: the reference
+    rows plus extra rows. ``partial``: the same rows, but the agent returned
+    only some of the reference columns. ``mismatch``: anything else.
+    """
+    if not expected_rows or not actual_rows:
+        return "match" if not expected_rows and not actual_rows else "mismatch"
+    n_expected, n_actual = len(expected_rows[0]), len(actual_rows[0])
+    # Candidate agent columns per reference column: those containing every (sampled) reference value
+    candidates = {}
+    for c in range(n_expected):
+        values = list({row[c] for row in expected_rows})[:50]
+        candidates[c] = [
+            j for j in range(n_actual)
+            if all(any(cells_equal(v, row[j]) for row in actual_rows) for v in values)
+        ]
+
+    def contained(columns, distinct_needed):
+        mappings = itertools.product(*(candidates[c] for c in columns))
+        for choice in itertools.islice(mappings, MAX_COLUMN_MAPPINGS):
+            if len(set(choice)) == len(choice) >= distinct_needed and \
+                    _rows_contained(expected_rows, actual_rows, dict(zip(columns, choice))):
+                return True
+        return False
+
+    if all(candidates.values()) and contained(list(range(n_expected)), n_expected):
+        return "match" if len(actual_rows) == len(expected_rows) else "superset"
+    # Partial: every agent column is one of the reference columns, but some reference columns are missing
+    matched = [c for c in range(n_expected) if candidates[c]]
+    if matched and len(actual_rows) == len(expected_rows) and n_actual <= len(matched):
+        for subset in itertools.combinations(matched, n_actual):
+            if contained(list(subset), n_actual):
+                return "partial"
+    return "mismatch"
+
+
+SQL_JUDGE_PROMPT = """\
+You are evaluating whether an AI agent's SQL query correctly answers a business question.
+The agent's result does not exactly match the reference result, so decide whether the difference matters.
+
+User question: {question}
+Reference SQL: {reference_sql}
+Reference result (first rows): {reference_rows}
+Agent SQL: {agent_sql}
+Agent result (first rows): {agent_rows}
+
+Score 1 if the agent's result answers the question as well as the reference (for example, the same answer
+with extra context rows or columns). Score 0 if it answers a different question or gets the answer wrong.
+
+Return JSON with exactly this format:
+{{"score": 0 or 1, "rationale": "<brief explanation>"}}
+"""
+
+
+def _llm_judge(question: str, reference_sql: str, agent_sql: str, reference_rows: list, agent_rows: list):
+    """Ask the judge model; returns ``{"score", "rationale"}`` or None when no judge is available."""
+    if not SQL_EVAL_JUDGE or backends.LLM_BACKEND != "openai":
+        return None
+    prompt = SQL_JUDGE_PROMPT.format(
+        question=question, reference_sql=reference_sql, agent_sql=agent_sql,
+        reference_rows=json.dumps(reference_rows[:5], default=str), agent_rows=json.dumps(agent_rows[:5], default=str),
+    )
+    try:
+        response = backends.get_backend().create(
+            model=SQL_EVAL_JUDGE_MODEL,
+            messages=[{"role": "system", "content": prompt}],
+            response_format={"type": "json_object"},
+        )
+        verdict = json.loads(response.choices[0].message.content)
+    except Exception:
+        return None
+    return {"score": 1 if verdict.get("score") else 0, "rationale": verdict.get("rationale")}
+
+
+def sql_eval(input=None, output=None, expected=None, metadata=None) -> dict:
+    """1 if the agent's SQL returns the reference SQL's result set, else 0; ambiguous cases go to a judge."""
+    agent_sql = output.get("sql_query") if isinstance(output, dict) else None
+    reference_sql = (metadata or {}).get("sql_query")
+    if not reference_sql:
+        return {"name": "sql_eval", "score": None, "metadata": {"verdict": "no_reference"}}
+    if not agent_sql:
+        return {"name": "sql_eval", "score": 0, "metadata": {"verdict": "no_sql"}}
+    # Reference results come from the ground-truth store, so re-scoring does not re-run them
+    reference = get_store(DB_PATH).result(reference_sql)
+    if reference["error"]:
+        return {"name": "sql_eval", "score": None, "metadata": {"verdict": "reference_error", "error": reference["error"]}}
+    reference_rows = reference["rows"]
+    try:
+        agent_rows = execute_sql(agent_sql)
+    except Exception as e:
+        return {"name": "sql_eval", "score": 0, "metadata": {"verdict": "error", "error": str(e)}}
+
+    verdict = compare_results(reference_rows, agent_rows)
+    if verdict in ("match", "mismatch"):
+        return {"name": "sql_eval", "score": 1 if verdict == "match" else 0, "metadata": {"verdict": verdict}}
+
+    judged = _llm_judge(input, reference_sql, agent_sql, reference_rows, agent_rows)
+    if judged is not None:
+        return {"name": "sql_eval", "score": judged["score"],
+                "metadata": {"verdict": verdict, "judge": SQL_EVAL_JUDGE_MODEL, "rationale": judged["rationale"]}}
+    # No judge: let the final answer decide whether the extra or missing columns/rows mattered
+    fallback = data_eval(input=input, output=output, expected=expected, metadata=metadata)
+    return {"name": "sql_eval", "score": fallback["score"], "metadata": {"verdict": verdict, "judge": "data_eval"}}
@@ -0,0 +1,228 @@
+"""Local prompt-variant x model sweep for the SQL agent.
+
+Runs every (prompt variant, model) pair over the dataset as one batched job
+through ``local_eval.run_eval``: a single worker pool with at most
+``--workers`` cases in flight. Pairs run one after another in the queue, so
+requests in flight share the same system prompt prefix (which the provider's
+prompt cache can reuse). In the default thread executor, every pair also
+shares the schema catalog, the SQL result cache, the ground-truth store and,
+when ``LLM_CACHE_MODE`` is set, the LLM response cache.
+
+The output is a matrix with one row per variant and model: mean scores,
+latency percentiles, tokens per case and estimated cost. Cost is an estimate
+from ``MODEL_PRICES`` (list prices as of ``MODEL_PRICES_DATE``). To use
+current or negotiated prices, point ``SWEEP_MODEL_PRICES`` at a JSON file of
+``{"model": [input, cached input, output]}`` in USD per 1M tokens.
+
+Variants are ``baseline`` (``SQL_SYSTEM_PROMPT``) plus one per ``--prompts``
+file. A ``.txt``/``.md`` file is one prompt, named after the file. A ``.json``
+file maps names to prompts.
+
+Usage:
+    python eval/sweep.py --prompts prompts/terse.txt prompts/verbose.txt --models gpt-5-mini,gpt-4o-mini
+    LLM_BACKEND=scripted python eval/sweep.py --prompts variants.json --generate 500 --workers 16
+    python eval/sweep.py --prompts variants.json --incremental     # re-run only changed variants
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from agents import backends
+from agents.llm_cache import get_llm_cache
+from bench.run_bench import summarize
+from eval.generate_dataset import generate_cases
+from eval.ground_truth import get_store
+from eval.local_eval import (DATASET_PATH, EVAL_CACHE_PATH, CaseCache, ResultStore, _mean_score, load_cases,
+                             run_eval)
+from prompts.sql_prompt import SQL_SYSTEM_PROMPT
+from tools.sql_tools import DB_PATH, query_cache_stats
+
+SWEEP_RESULTS_PATH = os.path.join(ROOT, "data", "sweep_results.jsonl")
+DEFAULT_MODELS = "gpt-5-mini"
+# USD per 1M tokens: (input, cached input, output); models not listed get no cost estimate.
+# These go stale: entries in the SWEEP_MODEL_PRICES file take precedence.
+MODEL_PRICES_DATE = "2025-08"
+MODEL_PRICES_PATH = os.environ.get("SWEEP_MODEL_PRICES", "")
+MODEL_PRICES = {
+    "gpt-5": (1.25, 0.125, 10.00),
+    "gpt-5-mini": (0.25, 0.025, 2.00),
+    "gpt-5-nano": (0.05, 0.005, 0.40),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+
+def load_variants(paths: list, include_baseline: bool = True) -> dict:
+    """Prompt variants by name, in the order given."""
+    variants = {"baseline": SQL_SYSTEM_PROMPT} if include_baseline else {}
+    for path in paths:
+        if path.endswith(".json"):
+            with open(path) as f:
+                variants.update(json.load(f))
+        else:
+            with open(path) as f:
+                variants[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    return variants
+
+
+def load_prices(path: str = MODEL_PRICES_PATH) -> dict:
+    """``MODEL_PRICES`` with any entries from the JSON file at ``path`` on top."""
+    prices = dict(MODEL_PRICES)
+    if path:
+        with open(path) as f:
+            prices.update({model: tuple(values) for model, values in json.load(f).items()})
+    return prices
+
+
+def cost_usd(model: str, usage: dict, prices: dict = None):
+    prices = (prices if prices is not None else MODEL_PRICES).get(model)
+    if prices is None:
+        return None
+    uncached = usage["prompt_tokens"] - usage["cached_tokens"]
+    return (uncached * prices[0] + usage["cached_tokens"] * prices[1] + usage["completion_tokens"] * prices[2]) / 1e6
+
+
+def matrix_row(variant: str, model: str, results: list, prices: dict = None) -> dict:
+    """Accuracy, latency and token cost for one variant and model."""
+    ok = [r for r in results if r["status"] == "ok"]
+    fresh = [r["latency_s"] for r in ok if not r.get("reused")]
+    stored = [r["latency_s"] for r in ok if r.get("reused")]
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+    for r in ok:
+        for key in usage:
+            usage[key] += (r.get("usage") or {}).get(key, 0)
+    score_names = sorted({name for r in ok for name in r["scores"]})
+    cost = cost_usd(model, usage, prices)
+    return {
+        "variant": variant,
+        "model": model,
+        "cases": len(results),
+        "ok": len(ok),
+        "reused": sum(1 for r in results if r.get("reused")),
+        "scores": {name: _mean_score(results, name) for name in score_names},
+        # Latency of cases run now; stored latencies of reused cases are kept apart
+        "latency": summarize(fresh) if fresh else None,
+        "reused_latency": summarize(stored) if stored else None,
+        "tokens_per_case": round((usage["prompt_tokens"] + usage["completion_tokens"]) / len(ok)) if ok else None,
+        "usage": usage,
+        "cost_usd": round(cost, 6) if cost is not None else None,
+    }
+
+
+def run_sweep(cases: list, variants: dict, models: list, workers: int = 8, executor: str = "thread",
+              timeout: float = 120.0, cache: CaseCache = None, on_result=None, prices: dict = None) -> tuple:
+    """Run every variant x model x case as one job; returns ``(matrix rows, wall seconds)``."""
+    pairs = [(variant, model) for variant in variants for model in models]
+    jobs, agent_kwargs = [], []
+    for variant, model in pairs:
+        for case in cases:
+            jobs.append(case)
+            agent_kwargs.append({"system_prompt": variants[variant], "model": model})
+
+    def tag(result):
+        variant, model = pairs[result["index"] // len(cases)]
+        result.update(variant=variant, model=model)
+        if on_result is not None:
+            on_result(result)
+
+    results, wall_s = run_eval(jobs, "sql", executor, workers, timeout, on_result=tag, cache=cache,
+                               agent_kwargs=agent_kwargs)
+    rows = [
+        matrix_row(variant, model, results[i * len(cases):(i + 1) * len(cases)], prices)
+        for i, (variant, model) in enumerate(pairs)
+    ]
+    return rows, wall_s
+
+
+def _cell(value, fmt: str, width: int) -> str:
+    return f"{value:>{width}{fmt}}" if value is not None else f"{'-':>{width}}"
+
+
+def print_matrix(rows: list):
+    score_names = sorted({name for row in rows for name in row["scores"]})
+    print(f"{'variant':<20} {'model':<14}" + "".join(f" {name:>10}" for name in score_names)
+          + f" {'p50 ms':>8} {'p95 ms':>8}  {'tok/case':>9} {'est. $':>9} {'reused':>7}")
+    for row in rows:
+        # Rows with no fresh cases show the stored latency, marked with *
+        latency = row["latency"] or row["reused_latency"] or {}
+        marker = "*" if not row["latency"] and row["reused_latency"] else " "
+        print(f"{row['variant'][:20]:<20} {row['model'][:14]:<14}"
+              + "".join(" " + _cell(row["scores"].get(name), ".2%", 10) for name in score_names)
+              + " " + _cell(latency.get("p50_ms"), ".1f", 8) + " " + _cell(latency.get("p95_ms"), ".1f", 8)
+              + marker + " " + _cell(row["tokens_per_case"], "", 9) + " " + _cell(row["cost_usd"], ".4f", 9)
+              + f" {row['reused']:>7}")
+    if any(not row["latency"] and row["reused_latency"] for row in rows):
+        print("* stored latency from the run that produced the reused results")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep SQL agent prompt variants and models over the eval dataset.")
+    parser.add_argument("--prompts", nargs="*", default=[], help=".txt/.md prompt files or a .json {name: prompt}")
+    parser.add_argument("--no-baseline", action="store_true", help="leave out SQL_SYSTEM_PROMPT")
+    parser.add_argument("--models", default=DEFAULT_MODELS, help="comma-separated model names")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--generate", type=int, metavar="N", help="use N generated template cases instead")
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread",
+                        help="thread shares the SQL, ground-truth and LLM caches across all variants")
+    parser.add_argument("--workers", type=int, default=8, help="cases in flight at once, across all variants")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds per case")
+    parser.add_argument("--results", default=SWEEP_RESULTS_PATH, help=".jsonl, or .db/.sqlite for a SQLite store")
+    parser.add_argument("--incremental", action="store_true", help="reuse stored results for unchanged cases")
+    parser.add_argument("--cache", default=EVAL_CACHE_PATH, help="case result store for --incremental")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    variants = load_variants(args.prompts, include_baseline=not args.no_baseline)
+    models = [m.strip() for m in args.models.split(",") if m.strip()]
+    if not variants or not models:
+        parser.error("need at least one prompt variant and one model")
+    cases = generate_cases(args.generate) if args.generate else load_cases(args.dataset)
+    config = {
+        "sweep": True, "variants": list(variants), "models": models,
+        "dataset": "generated" if args.generate else args.dataset, "cases": len(cases),
+        "executor": args.executor, "workers": args.workers, "timeout": args.timeout,
+        "backend": backends.LLM_BACKEND, "incremental": args.incremental,
+    }
+    run_id = f"sweep-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{os.getpid()}"
+    store = ResultStore(args.results, run_id, config)
+    print(f"Sweep {run_id}: {len(variants)} variants x {len(models)} models x {len(cases)} cases, "
+          f"{args.workers} {args.executor} workers")
+
+    prices = load_prices()
+    cache = CaseCache(args.cache) if args.incremental else None
+    rows, wall_s = run_sweep(cases, variants, models, args.workers, args.executor, args.timeout, cache,
+                             on_result=store.add, prices=prices)
+    if cache is not None:
+        cache.close()
+    store.finish({"wall_s": round(wall_s, 3), "matrix": rows,
+                  "prices": {"date": MODEL_PRICES_DATE, "override": MODEL_PRICES_PATH or None}})
+
+    print_matrix(rows)
+    print(f"est. $: token usage x list prices as of {MODEL_PRICES_DATE}"
+          + (f", overridden by {MODEL_PRICES_PATH}" if MODEL_PRICES_PATH else " (set SWEEP_MODEL_PRICES to override)"))
+    print(f"wall: {wall_s:.2f}s for {len(rows) * len(cases)} runs")
+    if args.executor == "thread":
+        sql_cache = query_cache_stats()
+        ground_truth = get_store(DB_PATH)
+        print(f"shared caches: SQL results {sql_cache.get('hits', 0)} hits / {sql_cache.get('misses', 0)} misses, "
+              f"ground truth {ground_truth.hits} hits / {ground_truth.computed} computed", end="")
+        llm_cache = get_llm_cache()
+        print(f", LLM responses {llm_cache.hits} hits / {llm_cache.misses} misses" if llm_cache else "")
+    print(f"Results: {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,7 @@ The database covers the 2024-25 NBA season and includes:
 - **Player Game Stats**: Full box score stats per player per game (points, rebounds, assists, steals, blocks, turnovers, shooting splits)
 - **Team Game Stats**: Team-level box score aggregates per game (FG%, 3P%, FT%, rebounds, assists)
 - **Seasons**: Season date ranges
+- **Season Aggregates**: Precomputed per-player season stats, per-team win/loss records and per-team shooting averages
 
 ## Formatting Guidelines
 - Present player names in full (first + last).
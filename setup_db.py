@@ -1,10 +1,26 @@
 """Generate synthetic NBA data and compute ground-truth values for eval."""
 
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import math
+import shutil
 import sqlite3
 import random
 import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
+try:
+    import numpy as np
+except ImportError:  # only needed for --vectorized
+    np = None
+
+from eval.ground_truth import GroundTruthStore
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -12,8 +28,8 @@ REFERENCE_DATE = datetime(2025, 1, 15)
 SEASON_START = datetime(2024, 10, 22)
 SEASON_END = datetime(2025, 1, 14)
 DB_PATH = os.path.join(os.path.dirname(__file__), "data", "nba.db")
-
-random.seed(42)
+EVAL_DATASET_PATH = os.path.join(os.path.dirname(__file__), "eval", "dataset.json")
+SEED = 42
 
 # 30 real NBA teams: (team_id, name, city, abbreviation, conference, division, founded_year, arena_name)
 TEAMS = [
@@ -84,6 +100,34 @@ POSITION_PROFILES = {
 # 3 players per position: depth 1 (starter), depth 2 (first sub), depth 3 (second sub)
 ROSTER_POSITIONS = ["PG", "SG", "SF", "PF", "C"] * 3
 
+# Multi-season builds (--seasons N): every season before 2024-25 is a full regular season
+HISTORY_GAMES_PER_TEAM = 82
+# Per season going back: chance a player was on another team / had not yet entered the league
+ROSTER_TRADE_RATE = 0.08
+ROSTER_NEWCOMER_RATE = 0.12
+
+# Rows per executemany call; generators stream rows, so this bounds memory during the load
+INSERT_CHUNK_SIZE = 10_000
+
+# player_game_stats columns summed into team_game_stats: rebounds, assists, turnovers,
+# fg_made, fg_attempted, three_made, three_attempted, ft_made, ft_attempted
+TEAM_TOTAL_COLUMNS = (6, 7, 10, 12, 13, 14, 15, 16, 17)
+
+# Synthetic franchises used when --teams exceeds 30:
+# (name, city, abbreviation, founded_year, arena_name)
+EXPANSION_TEAMS = [
+    ("SuperSonics", "Seattle",     "SEA", 1967, "Climate Pledge Arena"),
+    ("Royals",      "Kansas City", "KCR", 1972, "T-Mobile Center"),
+    ("Colonels",    "Louisville",  "LOU", 1967, "KFC Yum! Center"),
+    ("Spirits",     "St. Louis",   "STL", 1974, "Enterprise Center"),
+    ("Bullets",     "Baltimore",   "BAL", 1963, "CFG Bank Arena"),
+    ("Braves",      "Buffalo",     "BUF", 1970, "KeyBank Center"),
+    ("Condors",     "Pittsburgh",  "PIT", 1967, "PPG Paints Arena"),
+    ("Stars",       "San Diego",   "SDS", 1967, "Pechanga Arena"),
+    ("Squires",     "Virginia",    "VIR", 1970, "Chartway Arena"),
+    ("Voyageurs",   "Vancouver",   "VAN", 1995, "Rogers Arena"),
+]
+
 
 def create_tables(conn):
     cur = conn.cursor()
@@ -186,230 +230,582 @@ def create_tables(conn):
             FOREIGN KEY (game_id) REFERENCES games(game_id),
             FOREIGN KEY (team_id) REFERENCES teams(team_id)
         );
+
+        -- Materialized season aggregates, maintained by refresh_season_aggregates()
+
+        CREATE TABLE IF NOT EXISTS player_season_stats (
+            player_id         INTEGER NOT NULL,
+            season            TEXT NOT NULL,
+            team_id           INTEGER NOT NULL,
+            games_played      INTEGER NOT NULL,
+            minutes_played    INTEGER NOT NULL,
+            points            INTEGER NOT NULL,
+            rebounds          INTEGER NOT NULL,
+            assists           INTEGER NOT NULL,
+            steals            INTEGER NOT NULL,
+            blocks            INTEGER NOT NULL,
+            turnovers         INTEGER NOT NULL,
+            fouls             INTEGER NOT NULL,
+            fg_made           INTEGER NOT NULL,
+            fg_attempted      INTEGER NOT NULL,
+            three_made        INTEGER NOT NULL,
+            three_attempted   INTEGER NOT NULL,
+            ft_made           INTEGER NOT NULL,
+            ft_attempted      INTEGER NOT NULL,
+            plus_minus        INTEGER NOT NULL,
+            points_per_game   REAL NOT NULL,
+            rebounds_per_game REAL NOT NULL,
+            assists_per_game  REAL NOT NULL,
+            minutes_per_game  REAL NOT NULL,
+            PRIMARY KEY (player_id, season, team_id),
+            FOREIGN KEY (player_id) REFERENCES players(player_id),
+            FOREIGN KEY (team_id)   REFERENCES teams(team_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS team_season_records (
+            team_id        INTEGER NOT NULL,
+            season         TEXT NOT NULL,
+            games_played   INTEGER NOT NULL,
+            wins           INTEGER NOT NULL,
+            losses         INTEGER NOT NULL,
+            home_wins      INTEGER NOT NULL,
+            home_losses    INTEGER NOT NULL,
+            away_wins      INTEGER NOT NULL,
+            away_losses    INTEGER NOT NULL,
+            points_for     INTEGER NOT NULL,
+            points_against INTEGER NOT NULL,
+            PRIMARY KEY (team_id, season),
+            FOREIGN KEY (team_id) REFERENCES teams(team_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS team_season_shooting (
+            team_id              INTEGER NOT NULL,
+            season               TEXT NOT NULL,
+            games_played         INTEGER NOT NULL,
+            avg_points           REAL NOT NULL,
+            avg_rebounds         REAL NOT NULL,
+            avg_assists          REAL NOT NULL,
+            avg_turnovers        REAL NOT NULL,
+            avg_fg_percentage    REAL NOT NULL,
+            avg_three_percentage REAL NOT NULL,
+            avg_ft_percentage    REAL NOT NULL,
+            PRIMARY KEY (team_id, season),
+            FOREIGN KEY (team_id) REFERENCES teams(team_id)
+        );
     """)
     conn.commit()
 
 
-def generate_seasons(conn):
-    conn.execute(
-        "INSERT INTO seasons VALUES (?, ?, ?, ?)",
-        (1, "2024-25", SEASON_START.strftime("%Y-%m-%d"), SEASON_END.strftime("%Y-%m-%d")),
-    )
-    conn.commit()
+def refresh_season_aggregates(conn, seasons=None):
+    """Rebuild the materialized season tables for the given seasons (default: every season in games).
+
+    Does not commit, so ingest() can publish new games and their aggregates together.
+    """
+    if seasons is None:
+        seasons = [row[0] for row in conn.execute("SELECT DISTINCT season FROM games")]
+    for season in seasons:
+        conn.execute("DELETE FROM player_season_stats WHERE season = ?", (season,))
+        conn.execute("DELETE FROM team_season_records WHERE season = ?", (season,))
+        conn.execute("DELETE FROM team_season_shooting WHERE season = ?", (season,))
+
+        conn.execute("""
+            INSERT INTO player_season_stats
+            SELECT
+                pgs.player_id, g.season, pgs.team_id,
+                COUNT(*),
+                SUM(pgs.minutes_played), SUM(pgs.points), SUM(pgs.rebounds), SUM(pgs.assists),
+                SUM(pgs.steals), SUM(pgs.blocks), SUM(pgs.turnovers), SUM(pgs.fouls),
+                SUM(pgs.fg_made), SUM(pgs.fg_attempted),
+                SUM(pgs.three_made), SUM(pgs.three_attempted),
+                SUM(pgs.ft_made), SUM(pgs.ft_attempted),
+                SUM(pgs.plus_minus),
+                AVG(pgs.points), AVG(pgs.rebounds), AVG(pgs.assists), AVG(pgs.minutes_played)
+            FROM player_game_stats pgs
+            JOIN games g ON pgs.game_id = g.game_id
+            WHERE g.season = ?
+            GROUP BY pgs.player_id, g.season, pgs.team_id
+        """, (season,))
+
+        conn.execute("""
+            INSERT INTO team_season_records
+            SELECT
+                team_id, season,
+                COUNT(*),
+                SUM(won), SUM(lost),
+                SUM(is_home * won), SUM(is_home * lost),
+                SUM((1 - is_home) * won), SUM((1 - is_home) * lost),
+                SUM(points_for), SUM(points_against)
+            FROM (
+                SELECT home_team_id AS team_id, season, 1 AS is_home,
+                       home_score > away_score AS won, home_score < away_score AS lost,
+                       home_score AS points_for, away_score AS points_against
+                FROM games WHERE season = ?
+                UNION ALL
+                SELECT away_team_id, season, 0,
+                       away_score > home_score, away_score < home_score,
+                       away_score, home_score
+                FROM games WHERE season = ?
+            )
+            GROUP BY team_id, season
+        """, (season, season))
+
+        conn.execute("""
+            INSERT INTO team_season_shooting
+            SELECT
+                tgs.team_id, g.season,
+                COUNT(*),
+                AVG(tgs.points), AVG(tgs.rebounds), AVG(tgs.assists), AVG(tgs.turnovers),
+                AVG(tgs.fg_percentage), AVG(tgs.three_percentage), AVG(tgs.ft_percentage)
+            FROM team_game_stats tgs
+            JOIN games g ON tgs.game_id = g.game_id
+            WHERE g.season = ?
+            GROUP BY tgs.team_id, g.season
+        """, (season,))
+
+
+# Secondary indexes, driven by the eval/dataset.json workload:
+# - per-player aggregates (SUM/AVG of points, rebounds, assists, TS%) GROUP BY
+#   player_id are answered from a covering index without touching the table
+# - box-score lookups by game/team for joins and team aggregation
+# - per-team shooting averages are answered from a covering index
+# - date-range filters on games and roster lookups by team/season or player
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_pgs_player_totals ON player_game_stats"
+    "(player_id, points, rebounds, assists, fg_attempted, ft_attempted)",
+    "CREATE INDEX IF NOT EXISTS idx_pgs_game_team ON player_game_stats(game_id, team_id)",
+    "CREATE INDEX IF NOT EXISTS idx_tgs_game_team ON team_game_stats(game_id, team_id)",
+    "CREATE INDEX IF NOT EXISTS idx_tgs_team_shooting ON team_game_stats"
+    "(team_id, fg_percentage, three_percentage, ft_percentage)",
+    "CREATE INDEX IF NOT EXISTS idx_games_date ON games(game_date)",
+    "CREATE INDEX IF NOT EXISTS idx_rosters_team_season ON rosters(team_id, season)",
+    "CREATE INDEX IF NOT EXISTS idx_rosters_player ON rosters(player_id)",
+    # Leaderboard lookups on the season aggregate tables
+    "CREATE INDEX IF NOT EXISTS idx_pss_season_points ON player_season_stats(season, points)",
+    "CREATE INDEX IF NOT EXISTS idx_pss_season_ppg ON player_season_stats(season, points_per_game)",
+    "CREATE INDEX IF NOT EXISTS idx_tsr_season_wins ON team_season_records(season, wins)",
+]
+
+# Tables whose statistics are collected with ANALYZE. games/teams are left out:
+# with stats the planner switches the wins-per-team OR-join to a nested loop
+# over teams that is several times slower than the default plan.
+ANALYZE_TABLES = [
+    "player_game_stats", "team_game_stats", "rosters",
+    "player_season_stats", "team_season_records", "team_season_shooting",
+]
+
 
+def create_indexes(conn):
+    """Create secondary indexes (after bulk loading, which is cheaper) and gather planner stats."""
+    for statement in INDEXES:
+        conn.execute(statement)
+    analyze_tables(conn)
 
-def generate_teams(conn):
-    conn.executemany("INSERT INTO teams VALUES (?, ?, ?, ?, ?, ?, ?, ?)", TEAMS)
+
+def analyze_tables(conn):
+    for table in ANALYZE_TABLES:
+        conn.execute(f"ANALYZE {table}")
     conn.commit()
 
 
-def _height_str(pos):
+def insert_rows(conn, table, rows, chunk_size=INSERT_CHUNK_SIZE):
+    """Insert an iterable of row tuples in ``executemany`` chunks; returns the row count.
+
+    Does not commit: the caller owns the transaction.
+    """
+    rows = iter(rows)
+    count = 0
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return count
+        placeholders = ", ".join("?" * len(chunk[0]))
+        conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", chunk)
+        count += len(chunk)
+
+
+@contextlib.contextmanager
+def bulk_load(conn):
+    """Build with no rollback journal and no fsyncs, then restore durable settings.
+
+    Only safe for a fresh database file: a crash mid-build leaves it corrupt,
+    but main() deletes and rebuilds it anyway.
+    """
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    try:
+        yield conn
+        conn.commit()
+    finally:
+        conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {synchronous}")
+
+
+def build_seasons(n_seasons=1):
+    """Return season configs, oldest first; the last one is the in-progress 2024-25 season.
+
+    Earlier seasons are complete 82-game regular seasons running from late
+    October to mid April.
+    """
+    seasons = []
+    for offset in range(n_seasons - 1, 0, -1):
+        year = SEASON_START.year - offset
+        seasons.append({
+            "label": f"{year}-{(year + 1) % 100:02d}",
+            "start": datetime(year, 10, 22),
+            "end": datetime(year + 1, 4, 13),
+            "games_per_team": HISTORY_GAMES_PER_TEAM,
+        })
+    seasons.append({"label": "2024-25", "start": SEASON_START, "end": SEASON_END, "games_per_team": 40})
+    return seasons
+
+
+def build_teams(n_teams=len(TEAMS)):
+    """Return the first ``n_teams`` real teams, padded with synthetic expansion teams."""
+    teams = list(TEAMS[:n_teams])
+    for i in range(len(teams), n_teams):
+        n = i - len(TEAMS)
+        name, city, abbr, founded, arena = EXPANSION_TEAMS[n % len(EXPANSION_TEAMS)]
+        generation = n // len(EXPANSION_TEAMS)
+        if generation:
+            name, abbr = f"{name} {generation + 1}", f"{abbr[:2]}{generation + 1}"
+        conference = "Eastern" if i % 2 == 0 else "Western"
+        teams.append((i + 1, name, city, abbr, conference, "Expansion", founded, arena))
+    return teams
+
+
+def season_rng(seed, label):
+    """Independent, reproducible random stream for one historical season."""
+    return random.Random(f"{seed}:{label}")
+
+
+def generate_seasons(conn, seasons):
+    insert_rows(conn, "seasons", (
+        (season_id, s["label"], s["start"].strftime("%Y-%m-%d"), s["end"].strftime("%Y-%m-%d"))
+        for season_id, s in enumerate(seasons, start=1)
+    ))
+
+
+def generate_teams(conn, teams=TEAMS):
+    insert_rows(conn, "teams", teams)
+
+
+def _height_str(pos, rng=random):
     if pos == "C":
-        feet, inches = 7, random.randint(0, 1)
+        feet, inches = 7, rng.randint(0, 1)
     elif pos == "PF":
-        feet, inches = 6, random.randint(8, 11)
+        feet, inches = 6, rng.randint(8, 11)
     elif pos == "SF":
-        feet, inches = 6, random.randint(6, 9)
+        feet, inches = 6, rng.randint(6, 9)
     elif pos == "SG":
-        feet, inches = 6, random.randint(3, 7)
+        feet, inches = 6, rng.randint(3, 7)
     else:
-        feet, inches = 6, random.randint(0, 4)
+        feet, inches = 6, rng.randint(0, 4)
     return f"{feet}'{inches}\""
 
 
-def _weight(pos):
+def _weight(pos, rng=random):
     base = {"PG": 185, "SG": 200, "SF": 215, "PF": 225, "C": 245}
-    return base[pos] + random.randint(-15, 20)
+    return base[pos] + rng.randint(-15, 20)
+
+
+def _new_player(player_id, team_id, pos, depth_group, used_numbers, rng=random, season_year=SEASON_START.year):
+    """Draw one player; returns the ``players`` row and the generation profile.
+
+    ``season_year`` shifts birth and draft years back for players whose
+    careers ended before the current season.
+    """
+    years_back = SEASON_START.year - season_year
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    dob_base = datetime(1990 - years_back, 1, 1)
+    dob = dob_base + timedelta(days=rng.randint(0, 365 * 14))
+    college = rng.choice(COLLEGES) if rng.random() < 0.85 else None
+    draft_year = rng.randint(2010 - years_back, 2023 - years_back)
+    draft_round = rng.choices([1, 2], weights=[55, 45])[0]
+    draft_pick = rng.randint(1, 30) if draft_round == 1 else rng.randint(1, 30)
+
+    jersey = rng.randint(0, 55)
+    while jersey in used_numbers:
+        jersey = rng.randint(0, 55)
+    used_numbers.add(jersey)
+
+    profile = POSITION_PROFILES[pos]
+    # Starters (depth 0) get higher skill; bench gets lower
+    if depth_group == 0:
+        skill = rng.uniform(0.65, 1.0)
+    elif depth_group == 1:
+        skill = rng.uniform(0.40, 0.70)
+    else:
+        skill = rng.uniform(0.20, 0.45)
+
+    player_profile = {
+        "pos": pos,
+        "team_id": team_id,
+        "depth": depth_group,
+        "skill": skill,
+        "jersey": jersey,
+        "pts_per36": profile["pts"] * skill,
+        "reb_per36": profile["reb"] * skill,
+        "ast_per36": profile["ast"] * skill,
+        "stl_per36": profile["stl"] * skill,
+        "blk_per36": profile["blk"] * skill,
+        "to_per36": profile["to"] * skill,
+        "fg_pct": profile["fg_pct"] * rng.uniform(0.90, 1.08),
+        "three_rate": profile["three_rate"] * rng.uniform(0.85, 1.15),
+    }
+
+    row = (
+        player_id, first, last,
+        dob.strftime("%Y-%m-%d"),
+        _height_str(pos, rng), _weight(pos, rng),
+        pos, college, draft_year, draft_round, draft_pick,
+    )
+    return row, player_profile
 
 
-def generate_players(conn):
+def generate_players(conn, teams=TEAMS, players_per_team=len(ROSTER_POSITIONS)):
+    """Generate the current season's rosters: ``players_per_team`` players per team in depth groups of 5."""
     players = []
     player_profiles = {}
     player_id = 1
 
-    for team in TEAMS:
+    for team in teams:
         team_id = team[0]
         used_numbers = set()
 
-        for depth_group in range(3):
+        for depth_group in range(players_per_team // 5):
             for pos in ["PG", "SG", "SF", "PF", "C"]:
-                first = random.choice(FIRST_NAMES)
-                last = random.choice(LAST_NAMES)
-                dob_base = datetime(1990, 1, 1)
-                dob = dob_base + timedelta(days=random.randint(0, 365 * 14))
-                college = random.choice(COLLEGES) if random.random() < 0.85 else None
-                draft_year = random.randint(2010, 2023)
-                draft_round = random.choices([1, 2], weights=[55, 45])[0]
-                draft_pick = random.randint(1, 30) if draft_round == 1 else random.randint(1, 30)
-
-                jersey = random.randint(0, 55)
-                while jersey in used_numbers:
-                    jersey = random.randint(0, 55)
-                used_numbers.add(jersey)
-
-                profile = POSITION_PROFILES[pos]
-                # Starters (depth 0) get higher skill; bench gets lower
-                if depth_group == 0:
-                    skill = random.uniform(0.65, 1.0)
-                elif depth_group == 1:
-                    skill = random.uniform(0.40, 0.70)
-                else:
-                    skill = random.uniform(0.20, 0.45)
-
-                player_profiles[player_id] = {
-                    "pos": pos,
-                    "team_id": team_id,
-                    "depth": depth_group,
-                    "skill": skill,
-                    "jersey": jersey,
-                    "pts_per36": profile["pts"] * skill,
-                    "reb_per36": profile["reb"] * skill,
-                    "ast_per36": profile["ast"] * skill,
-                    "stl_per36": profile["stl"] * skill,
-                    "blk_per36": profile["blk"] * skill,
-                    "to_per36": profile["to"] * skill,
-                    "fg_pct": profile["fg_pct"] * random.uniform(0.90, 1.08),
-                    "three_rate": profile["three_rate"] * random.uniform(0.85, 1.15),
-                }
-
-                players.append((
-                    player_id, first, last,
-                    dob.strftime("%Y-%m-%d"),
-                    _height_str(pos), _weight(pos),
-                    pos, college, draft_year, draft_round, draft_pick,
-                ))
+                row, profile = _new_player(player_id, team_id, pos, depth_group, used_numbers)
+                player_profiles[player_id] = profile
+                players.append(row)
                 player_id += 1
 
-    conn.executemany("INSERT INTO players VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", players)
-    conn.commit()
+    insert_rows(conn, "players", players)
     print(f"Generated {len(players)} players")
     return players, player_profiles
 
 
-def generate_rosters(conn, player_profiles):
-    rosters = []
-    roster_id = 1
-    season = "2024-25"
-    start = SEASON_START.strftime("%Y-%m-%d")
-
-    for player_id, profile in player_profiles.items():
-        rosters.append((
-            roster_id, player_id, profile["team_id"],
-            season, profile["jersey"], start, None,
-        ))
-        roster_id += 1
-
-    conn.executemany("INSERT INTO rosters VALUES (?, ?, ?, ?, ?, ?, ?)", rosters)
-    conn.commit()
-    print(f"Generated {len(rosters)} roster entries")
+def plan_rosters(conn, player_profiles, teams, seasons, seed=SEED):
+    """Work backwards from the current rosters to build every earlier season's rosters.
+
+    Going back one season, a player may have been on another team (swapped
+    with the same position and depth slot there) or may not have entered the
+    league yet, in which case a veteran generated here holds the slot and keeps
+    it in the seasons before. Depth, skill and position stay fixed per player.
+    Returns ``(profiles, season_rosters)``: ``player_profiles`` plus the
+    veterans, and ``{season_label: {player_id: (team_id, jersey)}}``.
+    """
+    profiles = dict(player_profiles)
+    roster = {pid: (p["team_id"], p["jersey"]) for pid, p in player_profiles.items()}
+    season_rosters = {seasons[-1]["label"]: roster}
+    rng = random.Random(f"{seed}:rosters")
+    team_ids = [t[0] for t in teams]
+    next_id = max(player_profiles) + 1
+    veterans = 0
+
+    for season in reversed(seasons[:-1]):
+        roster = dict(roster)
+        slots = {(team_id, profiles[pid]["pos"], profiles[pid]["depth"]): pid for pid, (team_id, _) in roster.items()}
+
+        for pid in sorted(roster):
+            if rng.random() >= ROSTER_TRADE_RATE:
+                continue
+            team_id, jersey = roster[pid]
+            other_team = rng.choice(team_ids)
+            if other_team == team_id:
+                continue
+            here = (team_id, profiles[pid]["pos"], profiles[pid]["depth"])
+            there = (other_team, profiles[pid]["pos"], profiles[pid]["depth"])
+            other = slots[there]
+            roster[other] = (team_id, roster[other][1])
+            roster[pid] = (other_team, jersey)
+            slots[here], slots[there] = other, pid
+
+        new_players = []
+        for pid in sorted(roster):
+            if rng.random() >= ROSTER_NEWCOMER_RATE:
+                continue
+            team_id, _ = roster.pop(pid)
+            row, veteran = _new_player(
+                next_id, team_id, profiles[pid]["pos"], profiles[pid]["depth"], set(), rng,
+                season_year=season["start"].year,
+            )
+            profiles[next_id] = veteran
+            roster[next_id] = (team_id, veteran["jersey"])
+            new_players.append(row)
+            next_id += 1
+        veterans += insert_rows(conn, "players", new_players)
+
+        # Trades and veterans can bring a jersey number that is already taken on the team
+        used_numbers = {}
+        for pid in sorted(roster):
+            team_id, jersey = roster[pid]
+            taken = used_numbers.setdefault(team_id, set())
+            while jersey in taken:
+                jersey = rng.randint(0, 55)
+            taken.add(jersey)
+            roster[pid] = (team_id, jersey)
+
+        roster = dict(sorted(roster.items()))
+        season_rosters[season["label"]] = roster
+
+    if veterans:
+        print(f"Generated {veterans} players from earlier seasons")
+    return profiles, season_rosters
+
+
+def season_profiles(profiles, roster):
+    """Generation profiles for one season's roster (``{player_id: (team_id, jersey)}``)."""
+    return {pid: dict(profiles[pid], team_id=team_id, jersey=jersey) for pid, (team_id, jersey) in roster.items()}
+
+
+def generate_rosters(conn, seasons, season_rosters):
+    def rows():
+        roster_id = 1
+        for season in seasons:
+            start = season["start"].strftime("%Y-%m-%d")
+            # Only the current season's stints are still open
+            end = None if season is seasons[-1] else season["end"].strftime("%Y-%m-%d")
+            for player_id, (team_id, jersey) in season_rosters[season["label"]].items():
+                yield (roster_id, player_id, team_id, season["label"], jersey, start, end)
+                roster_id += 1
+
+    count = insert_rows(conn, "rosters", rows())
+    print(f"Generated {count} roster entries")
+
+
+def max_games_per_date(n_teams):
+    """Cap on games per date: 12 for the 30-team league, scaled with league size."""
+    return max(1, n_teams * 2 // 5)
+
+
+def _game_row(game_id, date, season_label, home, away, arena, rng=random):
+    """Draw the final score, overtime and attendance for one game; returns the ``games`` row."""
+    home_score = rng.randint(95, 135)
+    away_score = rng.randint(95, 135)
+
+    overtime_periods = 0
+    if abs(home_score - away_score) <= 3 and rng.random() < 0.35:
+        overtime_periods = rng.choices([1, 2], weights=[75, 25])[0]
+        bonus = rng.randint(4, 12) * overtime_periods
+        home_score += bonus
+        away_score += bonus - rng.randint(-3, 3)
+
+    attendance = rng.randint(14000, 21000)
 
+    return (
+        game_id, date.strftime("%Y-%m-%d"), season_label,
+        home, away, home_score, away_score,
+        arena, attendance, overtime_periods,
+    )
 
-def generate_games(conn):
-    """Generate a realistic NBA schedule from SEASON_START to SEASON_END."""
-    team_ids = [t[0] for t in TEAMS]
-    team_arena = {t[0]: t[7] for t in TEAMS}
 
-    # Build candidate matchups (home, away) – each ordered pair once
-    all_matchups = [(h, a) for h in team_ids for a in team_ids if h != a]
-    random.shuffle(all_matchups)
+def schedule_matchups(matchups, game_dates, team_ids, target_per_team, max_games_per_date, rng=random):
+    """Assign matchups to dates; returns one list of (home, away) per entry in ``game_dates``.
 
-    # Distribute games across dates (roughly 8-10 games per game day, ~5 days/week)
-    current = SEASON_START
-    game_dates = []
-    while current <= SEASON_END:
-        # ~75% of days have games (skip some Mondays/Tuesdays)
-        if not (current.weekday() == 0 and random.random() < 0.55):
-            game_dates.append(current)
-        current += timedelta(days=1)
-
-    # Assign matchups to dates, tracking games-per-team
+    Each matchup goes on the earliest date where neither team plays and the
+    date is not full, skipping matchups whose teams already reached the
+    target. If no such date exists, up to 20 random dates are tried without
+    the per-date cap. Occupancy is kept as bitmasks over date indices (one per
+    team, plus one of full dates) so finding a date is a few integer ops
+    instead of a scan over every date's games.
+    """
     games_per_team = {t: 0 for t in team_ids}
-    target_per_team = 40
-    games_on_date = {}  # date -> list of (home, away)
+    busy = {t: 0 for t in team_ids}  # bit i set = team plays on game_dates[i]
+    full = 0
+    all_dates = (1 << len(game_dates)) - 1
+    games_on_date = [[] for _ in game_dates]
 
-    for matchup in all_matchups:
-        home, away = matchup
+    for home, away in matchups:
         if games_per_team[home] >= target_per_team:
             continue
         if games_per_team[away] >= target_per_team:
             continue
 
-        # Find a date where neither team already has a game
-        placed = False
-        for d in game_dates:
-            teams_today = set()
-            for h2, a2 in games_on_date.get(d, []):
-                teams_today.add(h2)
-                teams_today.add(a2)
-            if home not in teams_today and away not in teams_today and len(games_on_date.get(d, [])) < 12:
-                games_on_date.setdefault(d, []).append((home, away))
-                games_per_team[home] += 1
-                games_per_team[away] += 1
-                placed = True
-                break
-
-        if not placed:
+        taken = busy[home] | busy[away]
+        free = all_dates & ~(taken | full)
+        if free:
+            i = (free & -free).bit_length() - 1
+        else:
             # try to find any remaining date
-            for d in random.sample(game_dates, min(20, len(game_dates))):
-                teams_today = set()
-                for h2, a2 in games_on_date.get(d, []):
-                    teams_today.add(h2)
-                    teams_today.add(a2)
-                if home not in teams_today and away not in teams_today:
-                    games_on_date.setdefault(d, []).append((home, away))
-                    games_per_team[home] += 1
-                    games_per_team[away] += 1
+            i = None
+            for j in rng.sample(range(len(game_dates)), min(20, len(game_dates))):
+                if not taken >> j & 1:
+                    i = j
                     break
+            if i is None:
+                continue
+
+        games_on_date[i].append((home, away))
+        games_per_team[home] += 1
+        games_per_team[away] += 1
+        busy[home] |= 1 << i
+        busy[away] |= 1 << i
+        if len(games_on_date[i]) >= max_games_per_date:
+            full |= 1 << i
+
+    return games_on_date
+
+
+def generate_games(conn, season, teams=TEAMS, rng=random, first_game_id=1):
+    """Generate a realistic NBA schedule between the season's start and end dates."""
+    team_ids = [t[0] for t in teams]
+    team_arena = {t[0]: t[7] for t in teams}
+    target_per_team = season["games_per_team"]
+
+    # Build candidate matchups (home, away) – each ordered pair once per round,
+    # with as many rounds as needed to reach the per-team target
+    rounds = max(1, math.ceil(target_per_team / (2 * (len(team_ids) - 1))))
+    all_matchups = [(h, a) for h in team_ids for a in team_ids if h != a] * rounds
+    rng.shuffle(all_matchups)
+
+    # Distribute games across dates (roughly 8-10 games per game day, ~5 days/week)
+    current = season["start"]
+    game_dates = []
+    while current <= season["end"]:
+        # ~75% of days have games (skip some Mondays/Tuesdays)
+        if not (current.weekday() == 0 and rng.random() < 0.55):
+            game_dates.append(current)
+        current += timedelta(days=1)
+
+    games_on_date = schedule_matchups(
+        all_matchups, game_dates, team_ids, target_per_team, max_games_per_date(len(team_ids)), rng,
+    )
 
     # Flatten and insert
     games = []
-    game_id = 1
-    for d in sorted(games_on_date.keys()):
-        for home, away in games_on_date[d]:
-            home_score = random.randint(95, 135)
-            away_score = random.randint(95, 135)
-
-            overtime_periods = 0
-            if abs(home_score - away_score) <= 3 and random.random() < 0.35:
-                overtime_periods = random.choices([1, 2], weights=[75, 25])[0]
-                bonus = random.randint(4, 12) * overtime_periods
-                home_score += bonus
-                away_score += bonus - random.randint(-3, 3)
-
-            attendance = random.randint(14000, 21000)
-            arena = team_arena[home]
-
-            games.append((
-                game_id, d.strftime("%Y-%m-%d"), "2024-25",
-                home, away, home_score, away_score,
-                arena, attendance, overtime_periods,
-            ))
+    game_id = first_game_id
+    for d, matchups in zip(game_dates, games_on_date):
+        for home, away in matchups:
+            games.append(_game_row(game_id, d, season["label"], home, away, team_arena[home], rng))
             game_id += 1
 
-    conn.executemany("INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", games)
-    conn.commit()
-    print(f"Generated {len(games)} games")
+    insert_rows(conn, "games", games)
+    print(f"Generated {len(games)} games for {season['label']}")
     return games
 
 
-def _player_game_stats(player_id, profile, minutes, game_pts_share, ot_periods):
+def _player_game_stats(player_id, profile, minutes, game_pts_share, ot_periods, rng=random):
     """Generate a single player's box score given minutes and their share of team pts."""
     if minutes == 0:
         return None
 
-    pts = max(0, round(profile["pts_per36"] * minutes / 36 + random.gauss(0, 2.5)))
-    reb = max(0, round(profile["reb_per36"] * minutes / 36 + random.gauss(0, 1.5)))
-    ast = max(0, round(profile["ast_per36"] * minutes / 36 + random.gauss(0, 1.0)))
-    stl = max(0, round(profile["stl_per36"] * minutes / 36 + random.gauss(0, 0.5)))
-    blk = max(0, round(profile["blk_per36"] * minutes / 36 + random.gauss(0, 0.4)))
-    to  = max(0, round(profile["to_per36"]  * minutes / 36 + random.gauss(0, 0.8)))
-    fouls = min(6, max(0, round(random.gauss(2.5, 1.0))))
+    pts = max(0, round(profile["pts_per36"] * minutes / 36 + rng.gauss(0, 2.5)))
+    reb = max(0, round(profile["reb_per36"] * minutes / 36 + rng.gauss(0, 1.5)))
+    ast = max(0, round(profile["ast_per36"] * minutes / 36 + rng.gauss(0, 1.0)))
+    stl = max(0, round(profile["stl_per36"] * minutes / 36 + rng.gauss(0, 0.5)))
+    blk = max(0, round(profile["blk_per36"] * minutes / 36 + rng.gauss(0, 0.4)))
+    to  = max(0, round(profile["to_per36"]  * minutes / 36 + rng.gauss(0, 0.8)))
+    fouls = min(6, max(0, round(rng.gauss(2.5, 1.0))))
 
     # Shooting breakdown
-    fg_pct = min(0.70, max(0.28, profile["fg_pct"] + random.gauss(0, 0.05)))
-    three_rate = min(0.60, max(0, profile["three_rate"] + random.gauss(0, 0.05)))
+    fg_pct = min(0.70, max(0.28, profile["fg_pct"] + rng.gauss(0, 0.05)))
+    three_rate = min(0.60, max(0, profile["three_rate"] + rng.gauss(0, 0.05)))
 
-    ft_pts = max(0, round(pts * random.uniform(0.10, 0.25)))
+    ft_pts = max(0, round(pts * rng.uniform(0.10, 0.25)))
     field_pts = pts - ft_pts
 
     three_pts = max(0, round(field_pts * three_rate))
@@ -425,9 +821,9 @@ def _player_game_stats(player_id, profile, minutes, game_pts_share, ot_periods):
     fg_att  = two_att + three_att
 
     ft_made = ft_pts
-    ft_att  = max(ft_made, round(ft_made / max(0.60, random.uniform(0.72, 0.92))))
+    ft_att  = max(ft_made, round(ft_made / max(0.60, rng.uniform(0.72, 0.92))))
 
-    plus_minus = round(random.gauss(0, 8))
+    plus_minus = round(rng.gauss(0, 8))
 
     return (
         player_id, minutes, pts, reb, ast, stl, blk, to, fouls,
@@ -435,8 +831,8 @@ def _player_game_stats(player_id, profile, minutes, game_pts_share, ot_periods):
     )
 
 
-def generate_player_game_stats(conn, games, player_profiles):
-    """Generate box score rows for every player in every game."""
+def iter_player_game_stats(games, player_profiles, rng=random, first_stat_id=1):
+    """Yield a box score row for every player in every game."""
     # Build team -> players list (sorted by depth)
     team_players = {}
     for pid, prof in player_profiles.items():
@@ -444,8 +840,7 @@ def generate_player_game_stats(conn, games, player_profiles):
     for tid in team_players:
         team_players[tid].sort(key=lambda x: (x[1]["depth"], x[0]))
 
-    rows = []
-    stat_id = 1
+    stat_id = first_stat_id
 
     for game in games:
         game_id, game_date, season, home_id, away_id, home_score, away_score, arena, attendance, ot_periods = game
@@ -455,7 +850,7 @@ def generate_player_game_stats(conn, games, player_profiles):
             # Use up to 13 active players; depth-2 bench (indices 10-14) sometimes DNP
             active = []
             for pid, prof in players_on_team:
-                if prof["depth"] < 2 or random.random() < 0.75:
+                if prof["depth"] < 2 or rng.random() < 0.75:
                     active.append((pid, prof))
 
             total_minutes = 240 + ot_periods * 25
@@ -465,11 +860,11 @@ def generate_player_game_stats(conn, games, player_profiles):
             player_minutes = []
             for i, (pid, prof) in enumerate(active):
                 if prof["depth"] == 0:
-                    mins = random.randint(28, 38)
+                    mins = rng.randint(28, 38)
                 elif prof["depth"] == 1:
-                    mins = random.randint(14, 24)
+                    mins = rng.randint(14, 24)
                 else:
-                    mins = random.randint(4, 12)
+                    mins = rng.randint(4, 12)
                 player_minutes.append(mins)
 
             # Scale to total_minutes
@@ -480,231 +875,570 @@ def generate_player_game_stats(conn, games, player_profiles):
 
             for i, (pid, prof) in enumerate(active):
                 mins = player_minutes[i]
-                result = _player_game_stats(pid, prof, mins, None, ot_periods)
+                result = _player_game_stats(pid, prof, mins, None, ot_periods, rng)
                 if result is None:
                     continue
                 (
                     pid2, minutes, pts, reb, ast, stl, blk, to, fouls,
                     fg_made, fg_att, three_made, three_att, ft_made, ft_att, plus_minus,
                 ) = result
-                rows.append((
+                yield (
                     stat_id, game_id, pid, team_id,
                     minutes, pts, reb, ast, stl, blk, to, fouls,
                     fg_made, fg_att, three_made, three_att, ft_made, ft_att, plus_minus,
-                ))
+                )
                 stat_id += 1
 
-    conn.executemany("INSERT INTO player_game_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
-    conn.commit()
-    print(f"Generated {len(rows)} player game stat rows")
-    return rows
 
+def _tally_team_totals(rows, team_totals):
+    """Pass box score rows through, summing the team_game_stats inputs per (game_id, team_id)."""
+    for row in rows:
+        key = (row[1], row[3])
+        totals = team_totals.get(key)
+        if totals is None:
+            totals = team_totals[key] = [0] * len(TEAM_TOTAL_COLUMNS)
+        for i, col in enumerate(TEAM_TOTAL_COLUMNS):
+            totals[i] += row[col]
+        yield row
+
+
+def generate_player_game_stats(conn, games, player_profiles, rng=random, first_stat_id=1, team_totals=None):
+    """Generate and insert box scores for every player in every game; returns the row count.
+
+    If ``team_totals`` is a dict, it is filled with per-(game_id, team_id)
+    sums for generate_team_game_stats.
+    """
+    rows = iter_player_game_stats(games, player_profiles, rng, first_stat_id)
+    if team_totals is not None:
+        rows = _tally_team_totals(rows, team_totals)
+    count = insert_rows(conn, "player_game_stats", rows)
+    print(f"Generated {count} player game stat rows")
+    return count
+
+
+def generate_player_game_stats_vectorized(conn, games, player_profiles, rng=random, first_stat_id=1, team_totals=None):
+    """NumPy version of generate_player_game_stats: same stat model, drawn for a whole season at once.
+
+    Every team-game is a row of a (team-games x roster slots) matrix, so each
+    noise term is a single array draw instead of one ``random`` call per player
+    per game. Rows come out in the same order as the scalar path, but the
+    values differ because they come from a NumPy stream seeded from ``rng``.
+    """
+    if np is None:
+        raise ImportError("generate_player_game_stats_vectorized requires numpy (pip install numpy)")
+    gen = np.random.default_rng(rng.getrandbits(64))
+
+    # team -> roster slots sorted by depth, padded to the largest roster
+    team_players = {}
+    for pid, prof in player_profiles.items():
+        team_players.setdefault(prof["team_id"], []).append((pid, prof))
+    team_index = {tid: i for i, tid in enumerate(sorted(team_players))}
+    slots = max(len(players) for players in team_players.values())
+    shape = (len(team_index), slots)
+    pid = np.zeros(shape, dtype=np.int64)
+    depth = np.full(shape, -1, dtype=np.int64)
+    attrs = {k: np.zeros(shape) for k in (
+        "pts_per36", "reb_per36", "ast_per36", "stl_per36", "blk_per36", "to_per36", "fg_pct", "three_rate",
+    )}
+    for tid, players in team_players.items():
+        players.sort(key=lambda x: (x[1]["depth"], x[0]))
+        for j, (player_id, prof) in enumerate(players):
+            i = team_index[tid]
+            pid[i, j] = player_id
+            depth[i, j] = prof["depth"]
+            for k, values in attrs.items():
+                values[i, j] = prof[k]
+
+    # One row per (game, team), home team first
+    game_ids = np.array([g[0] for g in games for _ in range(2)], dtype=np.int64)
+    team_ids = np.array([tid for g in games for tid in (g[3], g[4])], dtype=np.int64)
+    ot_periods = np.array([g[9] for g in games for _ in range(2)], dtype=np.int64)
+    rows_idx = np.array([team_index.get(tid, -1) for tid in team_ids.tolist()], dtype=np.int64)
+    n = len(rows_idx)
+
+    d = depth[rows_idx]
+    exists = (d >= 0) & (rows_idx >= 0)[:, None]
+    active = exists & ((d < 2) | (gen.random(d.shape) < 0.75))
+
+    # Minutes by depth, scaled to the team's total minutes
+    lo = np.select([d == 0, d == 1], [28, 14], 4)
+    hi = np.select([d == 0, d == 1], [38, 24], 12)
+    mins = np.where(active, gen.integers(lo, hi + 1), 0)
+    total_minutes = 240 + ot_periods * 25
+    assigned = mins.sum(axis=1)
+    scale = np.divide(total_minutes, assigned, out=np.zeros(n), where=assigned > 0)
+    mins = np.where(active, np.maximum(1, np.rint(mins * scale[:, None])), 0)
+
+    def per36(key, sd):
+        return np.maximum(0, np.rint(attrs[key][rows_idx] * mins / 36 + gen.normal(0, sd, d.shape)))
+
+    pts = per36("pts_per36", 2.5)
+    reb = per36("reb_per36", 1.5)
+    ast = per36("ast_per36", 1.0)
+    stl = per36("stl_per36", 0.5)
+    blk = per36("blk_per36", 0.4)
+    to = per36("to_per36", 0.8)
+    fouls = np.clip(np.rint(gen.normal(2.5, 1.0, d.shape)), 0, 6)
 
-def generate_team_game_stats(conn, games):
-    """Generate team-level game stats, aggregated from player_game_stats."""
-    cur = conn.cursor()
-    rows = []
-    stat_id = 1
+    # Shooting breakdown
+    fg_pct = np.clip(attrs["fg_pct"][rows_idx] + gen.normal(0, 0.05, d.shape), 0.28, 0.70)
+    three_rate = np.clip(attrs["three_rate"][rows_idx] + gen.normal(0, 0.05, d.shape), 0, 0.60)
 
-    for game in games:
-        game_id, _, _, home_id, away_id, home_score, away_score, _, _, _ = game
-
-        for team_id, team_score in ((home_id, home_score), (away_id, away_score)):
-            cur.execute("""
-                SELECT
-                    SUM(rebounds),
-                    SUM(assists),
-                    SUM(turnovers),
-                    SUM(fg_made), SUM(fg_attempted),
-                    SUM(three_made), SUM(three_attempted),
-                    SUM(ft_made), SUM(ft_attempted)
-                FROM player_game_stats
-                WHERE game_id = ? AND team_id = ?
-            """, (game_id, team_id))
-            agg = cur.fetchone()
-            if agg is None or agg[0] is None:
-                continue
+    ft_pts = np.maximum(0, np.rint(pts * gen.uniform(0.10, 0.25, d.shape)))
+    field_pts = pts - ft_pts
+    three_pts = np.maximum(0, np.rint(field_pts * three_rate))
+    two_pts = np.maximum(0, field_pts - three_pts)
 
-            reb, ast, to, fg_m, fg_a, thr_m, thr_a, ft_m, ft_a = agg
+    three_made = np.rint(three_pts / 3)
+    three_att = np.maximum(three_made, np.rint(three_made / np.maximum(0.35, fg_pct * 0.95)))
+    two_made = np.rint(two_pts / 2)
+    two_att = np.maximum(two_made, np.rint(two_made / np.maximum(0.35, fg_pct)))
 
-            fg_pct  = round(fg_m / fg_a, 3) if fg_a > 0 else 0.0
-            thr_pct = round(thr_m / thr_a, 3) if thr_a > 0 else 0.0
-            ft_pct  = round(ft_m / ft_a, 3) if ft_a > 0 else 0.0
+    ft_made = ft_pts
+    ft_att = np.maximum(ft_made, np.rint(ft_made / gen.uniform(0.72, 0.92, d.shape)))
+    plus_minus = np.rint(gen.normal(0, 8, d.shape))
+
+    count = int(active.sum())
+    columns = [
+        np.arange(first_stat_id, first_stat_id + count),
+        np.broadcast_to(game_ids[:, None], d.shape)[active],
+        pid[rows_idx][active],
+        np.broadcast_to(team_ids[:, None], d.shape)[active],
+    ] + [
+        values[active]
+        for values in (mins, pts, reb, ast, stl, blk, to, fouls,
+                       three_made + two_made, three_att + two_att, three_made, three_att,
+                       ft_made, ft_att, plus_minus)
+    ]
+    rows = np.column_stack(columns).astype(np.int64).tolist()
+
+    if team_totals is not None:
+        sums = np.column_stack([
+            np.where(active, values, 0).sum(axis=1)
+            for values in (reb, ast, to, three_made + two_made, three_att + two_att, three_made, three_att, ft_made, ft_att)
+        ]).astype(np.int64).tolist()
+        for game_id, team_id, has_players, totals in zip(game_ids.tolist(), team_ids.tolist(), active.any(axis=1).tolist(), sums):
+            if has_players:
+                team_totals[(game_id, team_id)] = totals
+
+    count = insert_rows(conn, "player_game_stats", map(tuple, rows))
+    print(f"Generated {count} player game stat rows")
+    return count
+
+
+def team_totals_from_db(conn, games):
+    """Sum player_game_stats per (game_id, team_id) for ``games`` in one grouped scan."""
+    game_ids = [g[0] for g in games]
+    if not game_ids:
+        return {}
+    cur = conn.execute("""
+        SELECT
+            game_id, team_id,
+            SUM(rebounds),
+            SUM(assists),
+            SUM(turnovers),
+            SUM(fg_made), SUM(fg_attempted),
+            SUM(three_made), SUM(three_attempted),
+            SUM(ft_made), SUM(ft_attempted)
+        FROM player_game_stats
+        WHERE game_id BETWEEN ? AND ?
+        GROUP BY game_id, team_id
+    """, (min(game_ids), max(game_ids)))
+    return {(row[0], row[1]): list(row[2:]) for row in cur}
+
+
+def generate_team_game_stats(conn, games, first_stat_id=1, team_totals=None):
+    """Generate team-level game stats from per-team box score totals; returns the row count.
+
+    ``team_totals`` is normally collected while the player rows are generated;
+    without it the totals are read back from player_game_stats in one query.
+    """
+    if team_totals is None:
+        team_totals = team_totals_from_db(conn, games)
+
+    def rows():
+        stat_id = first_stat_id
+        for game in games:
+            game_id, _, _, home_id, away_id, home_score, away_score, _, _, _ = game
+
+            for team_id, team_score in ((home_id, home_score), (away_id, away_score)):
+                totals = team_totals.get((game_id, team_id))
+                if totals is None:
+                    continue
 
-            rows.append((
-                stat_id, game_id, team_id,
-                team_score, reb or 0, ast or 0, to or 0,
-                fg_pct, thr_pct, ft_pct,
-            ))
-            stat_id += 1
+                reb, ast, to, fg_m, fg_a, thr_m, thr_a, ft_m, ft_a = totals
 
-    conn.executemany("INSERT INTO team_game_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
-    conn.commit()
-    print(f"Generated {len(rows)} team game stat rows")
+                fg_pct  = round(fg_m / fg_a, 3) if fg_a > 0 else 0.0
+                thr_pct = round(thr_m / thr_a, 3) if thr_a > 0 else 0.0
+                ft_pct  = round(ft_m / ft_a, 3) if ft_a > 0 else 0.0
 
+                yield (
+                    stat_id, game_id, team_id,
+                    team_score, reb, ast, to,
+                    fg_pct, thr_pct, ft_pct,
+                )
+                stat_id += 1
 
-def compute_ground_truth(conn):
-    cur = conn.cursor()
+    count = insert_rows(conn, "team_game_stats", rows())
+    print(f"Generated {count} team game stat rows")
+    return count
 
-    print("\n" + "=" * 60)
-    print("GROUND TRUTH VALUES (for eval dataset)")
-    print("=" * 60)
 
-    # 1. Player with most total points this season
-    cur.execute("""
-        SELECT p.first_name || ' ' || p.last_name AS player,
-               SUM(pgs.points) AS total_points
-        FROM player_game_stats pgs
-        JOIN players p ON pgs.player_id = p.player_id
-        GROUP BY pgs.player_id
-        ORDER BY total_points DESC
-        LIMIT 1
-    """)
-    top_scorer = cur.fetchone()
-    print(f"\n1. Top scorer: {top_scorer[0]} ({top_scorer[1]} points)")
-
-    # 2. Team with most wins this season
-    cur.execute("""
-        SELECT t.name, COUNT(*) AS wins
-        FROM games g
-        JOIN teams t ON (
-            (g.home_score > g.away_score AND g.home_team_id = t.team_id)
-            OR (g.away_score > g.home_score AND g.away_team_id = t.team_id)
-        )
-        GROUP BY t.team_id
-        ORDER BY wins DESC
-        LIMIT 1
-    """)
-    top_team = cur.fetchone()
-    print(f"\n2. Team with most wins: {top_team[0]} ({top_team[1]} wins)")
+def generate_season(conn, season, teams, roster, rng, vectorized=False, first_ids=(1, 1, 1)):
+    """Generate one season's games, box scores and team box scores.
 
-    # 3. Average team score per game
-    cur.execute("""
-        SELECT ROUND(AVG(points), 2)
-        FROM team_game_stats
-    """)
-    avg_score = cur.fetchone()[0]
-    print(f"\n3. Average team score per game: {avg_score}")
-
-    # 4. Player with highest single-game score
-    cur.execute("""
-        SELECT p.first_name || ' ' || p.last_name AS player,
-               pgs.points
-        FROM player_game_stats pgs
-        JOIN players p ON pgs.player_id = p.player_id
-        ORDER BY pgs.points DESC
-        LIMIT 1
-    """)
-    top_single = cur.fetchone()
-    print(f"\n4. Highest single-game score: {top_single[0]} ({top_single[1]} pts)")
-
-    # 5. Total games with overtime
-    cur.execute("""
-        SELECT COUNT(*)
-        FROM games
-        WHERE overtime_periods > 0
-    """)
-    ot_games = cur.fetchone()[0]
-    print(f"\n5. Games with overtime: {ot_games}")
-
-    # 6. Team with highest average FG% this season
-    cur.execute("""
-        SELECT t.name, ROUND(AVG(tgs.fg_percentage), 3) AS avg_fg
-        FROM team_game_stats tgs
-        JOIN teams t ON tgs.team_id = t.team_id
-        GROUP BY tgs.team_id
-        ORDER BY avg_fg DESC
-        LIMIT 1
-    """)
-    top_fg = cur.fetchone()
-    print(f"\n6. Best FG% team: {top_fg[0]} ({top_fg[1]})")
-
-    # 7. Player averaging most assists per game (min 10 games)
-    cur.execute("""
-        SELECT p.first_name || ' ' || p.last_name AS player,
-               ROUND(AVG(pgs.assists), 2) AS avg_ast,
-               COUNT(*) AS games_played
-        FROM player_game_stats pgs
-        JOIN players p ON pgs.player_id = p.player_id
-        GROUP BY pgs.player_id
-        HAVING COUNT(*) >= 10
-        ORDER BY avg_ast DESC
-        LIMIT 1
-    """)
-    top_ast = cur.fetchone()
-    print(f"\n7. Most assists per game: {top_ast[0]} ({top_ast[1]} apg, {top_ast[2]} games)")
-
-    # 8. Total games played this season
-    cur.execute("SELECT COUNT(*) FROM games")
-    total_games = cur.fetchone()[0]
-    print(f"\n8. Total games played: {total_games}")
-
-    # 9. Conference with more combined wins
-    cur.execute("""
-        SELECT t.conference, COUNT(*) AS wins
-        FROM games g
-        JOIN teams t ON (
-            (g.home_score > g.away_score AND g.home_team_id = t.team_id)
-            OR (g.away_score > g.home_score AND g.away_team_id = t.team_id)
-        )
-        GROUP BY t.conference
-        ORDER BY wins DESC
-        LIMIT 1
-    """)
-    top_conf = cur.fetchone()
-    print(f"\n9. Conference with more wins: {top_conf[0]} ({top_conf[1]} wins)")
-
-    # 10. Player with most rebounds per game (min 10 games)
-    cur.execute("""
-        SELECT p.first_name || ' ' || p.last_name AS player,
-               ROUND(AVG(pgs.rebounds), 2) AS avg_reb,
-               COUNT(*) AS games_played
-        FROM player_game_stats pgs
-        JOIN players p ON pgs.player_id = p.player_id
-        GROUP BY pgs.player_id
-        HAVING COUNT(*) >= 10
-        ORDER BY avg_reb DESC
-        LIMIT 1
-    """)
-    top_reb = cur.fetchone()
-    print(f"\n10. Most rebounds per game: {top_reb[0]} ({top_reb[1]} rpg, {top_reb[2]} games)")
+    ``first_ids`` are the first game, player_game_stats and team_game_stats
+    ids to use; returns how many rows of each were inserted.
+    """
+    game_id, stat_id, team_stat_id = first_ids
+    box_scores = generate_player_game_stats_vectorized if vectorized else generate_player_game_stats
+    games = generate_games(conn, season, teams, rng, first_game_id=game_id)
+    team_totals = {}
+    n_stats = box_scores(conn, games, roster, rng, first_stat_id=stat_id, team_totals=team_totals)
+    n_team_stats = generate_team_game_stats(conn, games, first_stat_id=team_stat_id, team_totals=team_totals)
+    return len(games), n_stats, n_team_stats
 
-    print("\n" + "=" * 60)
 
-    return {
-        "top_scorer": top_scorer,
-        "top_team": top_team,
-        "avg_score": avg_score,
-        "top_single": top_single,
-        "ot_games": ot_games,
-        "top_fg": top_fg,
-        "top_ast": top_ast,
-        "total_games": total_games,
-        "top_conf": top_conf,
-        "top_reb": top_reb,
+def build_season_shard(shard_path, season, teams, roster, seed, vectorized=False):
+    """Worker: generate one historical season into its own database file, with ids starting at 1."""
+    conn = sqlite3.connect(shard_path)
+    with contextlib.redirect_stdout(io.StringIO()), bulk_load(conn):
+        create_tables(conn)
+        counts = generate_season(conn, season, teams, roster, season_rng(seed, season["label"]), vectorized)
+    conn.close()
+    return counts
+
+
+def merge_season_shard(conn, shard_path, first_ids):
+    """Copy a shard's games and box scores into ``conn``, shifting ids to start at ``first_ids``."""
+    game_offset, stat_offset, team_stat_offset = (first_id - 1 for first_id in first_ids)
+    offsets = {
+        "games": {"game_id": game_offset},
+        "player_game_stats": {"player_game_stat_id": stat_offset, "game_id": game_offset},
+        "team_game_stats": {"team_game_stat_id": team_stat_offset, "game_id": game_offset},
     }
+    conn.commit()
+    conn.execute("ATTACH DATABASE ? AS shard", (shard_path,))
+    try:
+        for table, shifts in offsets.items():
+            columns = [row[1] for row in conn.execute(f"PRAGMA shard.table_info({table})")]
+            select = ", ".join(f"{c} + {shifts[c]}" if c in shifts else c for c in columns)
+            pk = columns[0]
+            conn.execute(f"INSERT INTO main.{table} SELECT {select} FROM shard.{table} ORDER BY {pk}")
+        conn.commit()
+    finally:
+        conn.execute("DETACH DATABASE shard")
+
+
+def compute_ground_truth(db_path):
+    """Run every reference query in eval/dataset.json into the ground-truth store and print the answers.
+
+    Results are stored next to the database (``eval/ground_truth.py``), where
+    the scorers read them. Returns ``{question: {"columns", "rows", "error"}}``.
+    """
+    store = GroundTruthStore(db_path)
+    with open(EVAL_DATASET_PATH) as f:
+        cases = json.load(f)
 
+    print("\n" + "=" * 60)
+    print("GROUND TRUTH VALUES (for eval dataset)")
+    print("=" * 60)
 
-def main():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    if os.path.exists(DB_PATH):
-        os.remove(DB_PATH)
-
-    conn = sqlite3.connect(DB_PATH)
-    create_tables(conn)
-    generate_seasons(conn)
-    generate_teams(conn)
-    _, player_profiles = generate_players(conn)
-    generate_rosters(conn, player_profiles)
-    games = generate_games(conn)
-    generate_player_game_stats(conn, games, player_profiles)
-    generate_team_game_stats(conn, games)
-    ground_truth = compute_ground_truth(conn)
+    ground_truth = {}
+    for i, case in enumerate(cases, 1):
+        result = store.result(case["metadata"]["sql_query"])
+        ground_truth[case["input"]] = result
+        if result["error"]:
+            answer = f"error: {result['error']}"
+        elif len(result["rows"]) == 1:
+            answer = ", ".join(f"{c}={v}" for c, v in zip(result["columns"], result["rows"][0]))
+        else:
+            answer = "; ".join(", ".join(map(str, row)) for row in result["rows"][:5])
+            if len(result["rows"]) > 5:
+                answer += f" ... ({len(result['rows'])} rows)"
+        print(f"\n{i}. {case['input']}\n   {answer}")
+
+    stats = store.build(cases)
+    store.close()
+    print("\n" + "=" * 60)
+    print(f"Stored {len(ground_truth)} reference results in {store.path} ({stats['pruned']} stale entries dropped)")
+    return ground_truth
+
+
+def main(db_path=DB_PATH, n_seasons=1, n_teams=len(TEAMS), players_per_team=len(ROSTER_POSITIONS), seed=SEED,
+         vectorized=False, workers=1):
+    """Build the database. The defaults produce the single-season dataset eval/dataset.json is written against.
+
+    ``vectorized`` generates box scores with NumPy: much faster at large
+    scales, statistically equivalent, but not the same rows as the default.
+    ``workers`` > 1 builds the seasons before 2024-25 in a process pool, one
+    shard database per season, and merges them in order; the result does not
+    depend on the worker count.
+    """
+    if n_seasons < 1:
+        raise ValueError("n_seasons must be at least 1")
+    if n_teams < 2:
+        raise ValueError("n_teams must be at least 2")
+    if players_per_team < 5 or players_per_team % 5:
+        raise ValueError("players_per_team must be a positive multiple of 5")
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if vectorized and np is None:
+        raise ImportError("vectorized generation requires numpy (pip install numpy)")
+
+    # Seed here rather than at import so repeated builds in one process are identical
+    random.seed(seed)
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    seasons = build_seasons(n_seasons)
+    teams = build_teams(n_teams)
+
+    conn = sqlite3.connect(db_path)
+    with bulk_load(conn):
+        create_tables(conn)
+        generate_seasons(conn, seasons)
+        generate_teams(conn, teams)
+        _, player_profiles = generate_players(conn, teams, players_per_team)
+        profiles, season_rosters = plan_rosters(conn, player_profiles, teams, seasons, seed)
+        generate_rosters(conn, seasons, season_rosters)
+        conn.commit()
+
+        # Earlier seasons each get their own stream, so they can be built in any
+        # order or process. The current season keeps drawing from the global stream
+        # seeded above, so it comes out the same at every scale.
+        first_ids = (1, 1, 1)
+        history = seasons[:-1]
+        if workers > 1 and history:
+            shard_dir = tempfile.mkdtemp(prefix=".shards-", dir=os.path.dirname(db_path))
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [
+                        pool.submit(
+                            build_season_shard, os.path.join(shard_dir, f"{season['label']}.db"), season, teams,
+                            season_profiles(profiles, season_rosters[season["label"]]), seed, vectorized,
+                        )
+                        for season in history
+                    ]
+                    # Merge in season order while later shards are still being built
+                    for season, future in zip(history, futures):
+                        counts = future.result()
+                        merge_season_shard(conn, os.path.join(shard_dir, f"{season['label']}.db"), first_ids)
+                        print(f"Merged {season['label']}: {counts[0]} games, {counts[1]} player and {counts[2]} team game stat rows")
+                        first_ids = tuple(first + n for first, n in zip(first_ids, counts))
+            finally:
+                shutil.rmtree(shard_dir, ignore_errors=True)
+        else:
+            for season in history:
+                roster = season_profiles(profiles, season_rosters[season["label"]])
+                counts = generate_season(conn, season, teams, roster, season_rng(seed, season["label"]), vectorized, first_ids)
+                first_ids = tuple(first + n for first, n in zip(first_ids, counts))
+                conn.commit()
+
+        current = seasons[-1]
+        generate_season(conn, current, teams, season_profiles(profiles, season_rosters[current["label"]]),
+                        random, vectorized, first_ids)
+        conn.commit()
+
+        refresh_season_aggregates(conn)
+        # Data version, bumped by every ingest(); tools/db_pool.py keys result caches on it
+        conn.execute("PRAGMA user_version = 1")
+        create_indexes(conn)
+    conn.execute("VACUUM")
     conn.close()
+    ground_truth = compute_ground_truth(db_path)
 
-    print(f"\nDatabase created at: {DB_PATH}")
+    print(f"\nDatabase created at: {db_path}")
     return ground_truth
 
 
+def estimate_profiles(conn, season_label):
+    """Rebuild generation profiles for a season's roster from the stats recorded so far.
+
+    Per-36 rates and shooting come from ``player_season_stats``; depth is the
+    player's minutes-per-game rank within the team (5 per depth group). Players
+    without minutes yet get deep-bench numbers for their position.
+    """
+    rows = conn.execute("""
+        SELECT
+            r.player_id, r.team_id, r.jersey_number, p.position,
+            COALESCE(SUM(s.minutes_played), 0), COALESCE(SUM(s.games_played), 0),
+            SUM(s.points), SUM(s.rebounds), SUM(s.assists), SUM(s.steals), SUM(s.blocks), SUM(s.turnovers),
+            SUM(s.fg_made), SUM(s.fg_attempted), SUM(s.three_made), SUM(s.ft_made)
+        FROM rosters r
+        JOIN players p ON p.player_id = r.player_id
+        LEFT JOIN player_season_stats s ON s.player_id = r.player_id AND s.season = r.season
+        WHERE r.season = ?
+        GROUP BY r.player_id, r.team_id
+        ORDER BY r.player_id
+    """, (season_label,)).fetchall()
+
+    profiles = {}
+    by_team = {}
+    for (pid, team_id, jersey, pos, minutes, games_played,
+         pts, reb, ast, stl, blk, to, fg_m, fg_a, thr_m, ft_m) in rows:
+        base = POSITION_PROFILES[pos]
+        if minutes:
+            per36 = 36 / minutes
+            rates = {
+                "pts_per36": pts * per36, "reb_per36": reb * per36, "ast_per36": ast * per36,
+                "stl_per36": stl * per36, "blk_per36": blk * per36, "to_per36": to * per36,
+                "fg_pct": fg_m / fg_a if fg_a else base["fg_pct"],
+                "three_rate": 3 * thr_m / (pts - ft_m) if pts > ft_m else base["three_rate"],
+            }
+        else:
+            skill = 0.3
+            rates = {
+                "pts_per36": base["pts"] * skill, "reb_per36": base["reb"] * skill, "ast_per36": base["ast"] * skill,
+                "stl_per36": base["stl"] * skill, "blk_per36": base["blk"] * skill, "to_per36": base["to"] * skill,
+                "fg_pct": base["fg_pct"], "three_rate": base["three_rate"],
+            }
+        profiles[pid] = {"pos": pos, "team_id": team_id, "jersey": jersey, **rates}
+        by_team.setdefault(team_id, []).append((-(minutes / games_played if games_played else 0), pid))
+
+    for players in by_team.values():
+        for rank, (_, pid) in enumerate(sorted(players)):
+            profiles[pid]["depth"] = min(rank // 5, 2)
+    return profiles
+
+
+def schedule_day(team_ids, rng=random):
+    """Pick one date's slate: a random number of games, every team playing at most once."""
+    order = list(team_ids)
+    rng.shuffle(order)
+    n_games = rng.randint(max(1, max_games_per_date(len(order)) // 2), max_games_per_date(len(order)))
+    return [(order[2 * i], order[2 * i + 1]) for i in range(min(n_games, len(order) // 2))]
+
+
+def ingest(db_path=DB_PATH, start=None, end=None, seed=SEED):
+    """Append games and box scores for each date in ``[start, end]`` to an existing database.
+
+    Dates that already have games are skipped, so re-running a range is a
+    no-op. Each date draws from its own seed-derived stream, and players
+    perform at the per-36 rates recorded so far this season (see
+    estimate_profiles).
+    The affected season aggregates are rebuilt and ``PRAGMA user_version``
+    (the data version) is bumped in the same transaction as the new rows;
+    planner stats are refreshed afterwards. Returns a summary dict.
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"No database at {db_path}; run setup_db.py first")
+    start = datetime.strptime(start, "%Y-%m-%d") if isinstance(start, str) else start
+    end = datetime.strptime(end, "%Y-%m-%d") if isinstance(end, str) else (end or start)
+    if end < start:
+        raise ValueError("end date is before start date")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        teams = conn.execute("SELECT * FROM teams ORDER BY team_id").fetchall()
+        team_ids = [t[0] for t in teams]
+        team_arena = {t[0]: t[7] for t in teams}
+        existing = {
+            row[0] for row in conn.execute(
+                "SELECT DISTINCT game_date FROM games WHERE game_date BETWEEN ? AND ?",
+                (start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")),
+            )
+        }
+        game_id, stat_id, team_stat_id = (
+            conn.execute(f"SELECT COALESCE(MAX({pk}), 0) + 1 FROM {table}").fetchone()[0]
+            for table, pk in (("games", "game_id"), ("player_game_stats", "player_game_stat_id"),
+                              ("team_game_stats", "team_game_stat_id"))
+        )
+
+        profiles_by_season = {}
+        season_ends = {}
+        counts = {"games": 0, "player_game_stats": 0, "team_game_stats": 0}
+        day = start
+        while day <= end:
+            date = day.strftime("%Y-%m-%d")
+            day += timedelta(days=1)
+            if date in existing:
+                continue
+            season = conn.execute(
+                "SELECT year FROM seasons WHERE start_date <= ? ORDER BY start_date DESC LIMIT 1", (date,),
+            ).fetchone()
+            if season is None:
+                raise ValueError(f"No season covers {date}")
+            label = season[0]
+            if label not in profiles_by_season:
+                profiles_by_season[label] = estimate_profiles(conn, label)
+
+            rng = random.Random(f"{seed}:ingest:{date}")
+            games = [
+                _game_row(game_id + i, datetime.strptime(date, "%Y-%m-%d"), label, home, away, team_arena[home], rng)
+                for i, (home, away) in enumerate(schedule_day(team_ids, rng))
+            ]
+            insert_rows(conn, "games", games)
+            team_totals = {}
+            n_stats = insert_rows(conn, "player_game_stats", _tally_team_totals(
+                iter_player_game_stats(games, profiles_by_season[label], rng, stat_id), team_totals,
+            ))
+            with contextlib.redirect_stdout(io.StringIO()):
+                n_team_stats = generate_team_game_stats(conn, games, team_stat_id, team_totals)
+
+            game_id += len(games)
+            stat_id += n_stats
+            team_stat_id += n_team_stats
+            counts["games"] += len(games)
+            counts["player_game_stats"] += n_stats
+            counts["team_game_stats"] += n_team_stats
+            season_ends[label] = date
+
+        if not counts["games"]:
+            conn.rollback()
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            return {**counts, "seasons": [], "data_version": version}
+
+        # An in-progress season now runs through the last ingested date
+        for label, last_date in season_ends.items():
+            conn.execute("UPDATE seasons SET end_date = MAX(end_date, ?) WHERE year = ?", (last_date, label))
+        refresh_season_aggregates(conn, list(season_ends))
+        version = conn.execute("PRAGMA user_version").fetchone()[0] + 1
+        conn.execute(f"PRAGMA user_version = {version}")
+        conn.commit()
+        analyze_tables(conn)
+    finally:
+        conn.close()
+
+    return {**counts, "seasons": list(season_ends), "data_version": version}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seasons", type=int, default=1,
+                        help="number of seasons, ending with 2024-25; earlier ones are full 82-game seasons")
+    parser.add_argument("--teams", type=int, default=len(TEAMS),
+                        help="number of teams; beyond 30, synthetic expansion teams are added")
+    parser.add_argument("--players-per-team", type=int, default=len(ROSTER_POSITIONS),
+                        help="roster size per team (multiple of 5)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument("--vectorized", action="store_true",
+                        help="generate box scores with NumPy (faster; different rows than the default build)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes for generating seasons before 2024-25 (output does not depend on this)")
+    parser.add_argument("--ingest-from", metavar="YYYY-MM-DD",
+                        help="append games from this date to the existing database instead of rebuilding it")
+    parser.add_argument("--ingest-to", metavar="YYYY-MM-DD", help="last date to ingest (default: --ingest-from)")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.ingest_from:
+        summary = ingest(args.db_path, args.ingest_from, args.ingest_to, seed=args.seed)
+        print(
+            f"Ingested {summary['games']} games, {summary['player_game_stats']} player and "
+            f"{summary['team_game_stats']} team game stat rows; data version is now {summary['data_version']}"
+        )
+    else:
+        main(
+            db_path=args.db_path,
+            n_seasons=args.seasons,
+            n_teams=args.teams,
+            players_per_team=args.players_per_team,
+            seed=args.seed,
+            vectorized=args.vectorized,
+            workers=args.workers,
+        )
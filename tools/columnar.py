@@ -0,0 +1,644 @@
+"""Columnar snapshot of the NBA database and a NumPy executor for simple aggregate queries.
+
+``python -m tools.columnar`` writes every table as one ``.npy`` file per
+column under ``data/columnar/<table>/``, plus a ``manifest.json`` recording
+the database file and data version (``PRAGMA user_version``) it was taken
+from. ``ColumnarSnapshot`` memory-maps those files and answers a whitelisted
+family of queries with vectorized NumPy:
+
+    SELECT <items> FROM <table> [alias]
+        [JOIN <lookup table> [alias] ON <column> = <lookup INTEGER PRIMARY KEY>]
+        [WHERE <column> <op> <column or literal> AND ...]
+        [GROUP BY <column>] [HAVING <aggregate> <op> <number> AND ...]
+        [ORDER BY <item> [ASC|DESC]] [LIMIT <n>]
+
+Items are columns, ``||`` concatenations of columns and string literals, and
+COUNT/SUM/AVG/MIN/MAX, optionally wrapped in ROUND(). Anything else returns
+None so the caller runs the query on SQLite. So do the cases where the answer
+could differ from SQLite's: NULLs, ties inside an ORDER BY/LIMIT window, and
+unrounded SUM/AVG of REAL columns (SQLite's float sum depends on its scan
+order).
+"""
+
+import argparse
+import json
+import math
+import operator
+import os
+import re
+import shutil
+import sqlite3
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # the columnar path is optional
+    np = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(ROOT, "data", "nba.db")
+COLUMNAR_DIR = os.path.join(ROOT, "data", "columnar")
+MANIFEST = "manifest.json"
+# Bumped when the manifest's meaning changes; snapshots in an older format are ignored until re-exported
+SNAPSHOT_FORMAT = 2
+EXPORT_CHUNK_ROWS = 65_536
+
+COMPARISONS = {
+    "=": operator.eq, "==": operator.eq, "!=": operator.ne, "<>": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+# Constructs outside the whitelist; their presence sends the query to SQLite
+_UNSUPPORTED_WORDS = re.compile(
+    r"\b(with|union|intersect|except|distinct|case|or|not|in|between|like|glob|is|null|exists|over|"
+    r"offset|left|right|full|outer|cross|natural|using|cast|collate)\b|\(\s*select\b|[\"`\[]|--|/\*",
+    re.IGNORECASE,
+)
+_QUERY = re.compile(
+    r"^\s*select\s+(?P<select>.+?)\s+from\s+(?P<from>.+?)"
+    r"(?:\s+where\s+(?P<where>.+?))?"
+    r"(?:\s+group\s+by\s+(?P<group>.+?))?"
+    r"(?:\s+having\s+(?P<having>.+?))?"
+    r"(?:\s+order\s+by\s+(?P<order>.+?))?"
+    r"(?:\s+limit\s+(?P<limit>\d+))?\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+_ALIAS = r"(?:\s+(?:as\s+)?(?!join\b|inner\b|on\b)(\w+))?"
+_FROM = re.compile(
+    rf"^(\w+){_ALIAS}(?:\s+(?:inner\s+)?join\s+(\w+){_ALIAS}\s+on\s+([\w.]+)\s*=\s*([\w.]+))?$",
+    re.IGNORECASE,
+)
+_AGGREGATE = re.compile(r"^(count|sum|avg|min|max)\s*\(\s*(\*|[a-z_][\w.]*)\s*\)$", re.IGNORECASE)
+_ROUND = re.compile(r"^round\s*\(\s*(.+?)\s*(?:,\s*(\d+)\s*)?\)$", re.IGNORECASE)
+_REF = re.compile(r"^[a-z_]\w*(?:\.[a-z_]\w*)?$", re.IGNORECASE)
+_NUMBER = re.compile(r"^-?\d+(?:\.\d+)?$")
+_LITERAL = re.compile(r"^__lit(\d+)__$")
+_CONDITION = re.compile(r"^(.+?)\s*(==|=|!=|<>|<=|>=|<|>)\s*(.+)$")
+
+
+class Unsupported(Exception):
+    """The query is outside the columnar whitelist; run it on SQLite."""
+
+
+def _column_kind(declared_type: str) -> str:
+    declared = declared_type.upper()
+    if "INT" in declared:
+        return "int"
+    if any(t in declared for t in ("REAL", "FLOA", "DOUB")):
+        return "real"
+    return "text"
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+def _export_table(conn, table, out_dir):
+    os.makedirs(out_dir)
+    info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    n_rows = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    names = [row[1] for row in info]
+    arrays, nulls, meta = {}, {}, {}
+    # Only a single-column INTEGER PRIMARY KEY is a unique join key; each column of a composite key repeats
+    single_key = sum(1 for row in info if row[5]) == 1
+    for _, name, declared, _, _, pk in info:
+        kind = _column_kind(declared)
+        if kind == "text":
+            width = conn.execute(f"SELECT MAX(LENGTH({name})) FROM {table}").fetchone()[0] or 1
+            arrays[name] = np.full(n_rows, "", dtype=f"<U{width}")
+        else:
+            arrays[name] = np.zeros(n_rows, dtype=np.int64 if kind == "int" else np.float64)
+        nulls[name] = np.zeros(n_rows, dtype=bool)
+        meta[name] = {"type": kind, "primary_key": single_key and bool(pk) and kind == "int"}
+
+    fill = {"int": 0, "real": 0.0, "text": ""}
+    cur = conn.execute(f"SELECT {', '.join(names)} FROM {table} ORDER BY rowid")
+    pos = 0
+    while True:
+        batch = cur.fetchmany(EXPORT_CHUNK_ROWS)
+        if not batch:
+            break
+        end = pos + len(batch)
+        for j, name in enumerate(names):
+            values = [row[j] for row in batch]
+            missing = [v is None for v in values]
+            if any(missing):
+                nulls[name][pos:end] = missing
+                values = [fill[meta[name]["type"]] if v is None else v for v in values]
+            arrays[name][pos:end] = values
+        pos = end
+
+    for name in names:
+        if meta[name]["primary_key"] and np.any(np.diff(arrays[name]) <= 0):
+            # The JOIN lookup needs keys that are unique and ascending in row order
+            meta[name]["primary_key"] = False
+        np.save(os.path.join(out_dir, f"{name}.npy"), arrays[name])
+        meta[name]["nullable"] = bool(nulls[name].any())
+        if meta[name]["nullable"]:
+            np.save(os.path.join(out_dir, f"{name}.null.npy"), nulls[name])
+    return {"rows": n_rows, "columns": meta}
+
+
+def export_snapshot(db_path: str = DB_PATH, out_dir: str = COLUMNAR_DIR) -> dict:
+    """Write every table of ``db_path`` to ``out_dir`` as per-column ``.npy`` files; returns the manifest."""
+    if np is None:
+        raise ImportError("the columnar snapshot requires numpy (pip install numpy)")
+    st = os.stat(db_path)
+    tmp_dir = out_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, isolation_level=None)
+    try:
+        # One read transaction, so the snapshot cannot straddle an ingest
+        conn.execute("BEGIN")
+        data_version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if not data_version:
+            raise ValueError(f"{db_path} has no data version (PRAGMA user_version); rebuild it with setup_db.py")
+        tables = [
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+        ]
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "db_path": os.path.abspath(db_path),
+            "file_id": [st.st_dev, st.st_ino],
+            "data_version": data_version,
+            "tables": {table: _export_table(conn, table, os.path.join(tmp_dir, table)) for table in tables},
+        }
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    with open(os.path.join(tmp_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Query execution
+# ---------------------------------------------------------------------------
+class ResultCursor:
+    """Minimal DB-API cursor over computed rows (what tools.sql_tools._serialize_rows reads)."""
+
+    def __init__(self, columns: list, rows: list):
+        self.description = [(name, None, None, None, None, None, None) for name in columns]
+        self._rows = rows
+        self._pos = 0
+
+    def fetchmany(self, size: int) -> list:
+        batch = self._rows[self._pos:self._pos + size]
+        self._pos += len(batch)
+        return batch
+
+
+def _split_top_level(text: str, sep: str = ",") -> list:
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(text):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts]
+
+
+class _Query:
+    """One parsed query bound to a snapshot; raises Unsupported anywhere outside the whitelist."""
+
+    def __init__(self, snapshot, sql: str):
+        self.snapshot = snapshot
+        self.literals = []
+        masked = re.sub(r"'((?:[^']|'')*)'", self._mask_literal, sql.strip())
+        if _UNSUPPORTED_WORDS.search(masked):
+            raise Unsupported("construct")
+        match = _QUERY.match(masked)
+        if not match:
+            raise Unsupported("shape")
+        self.clauses = match.groupdict()
+        self._parse_from(self.clauses["from"])
+
+    def _mask_literal(self, match) -> str:
+        self.literals.append(match.group(1).replace("''", "'"))
+        return f"__lit{len(self.literals) - 1}__"
+
+    def _unmask(self, text: str) -> str:
+        return re.sub(r"__lit(\d+)__", lambda m: "'" + self.literals[int(m.group(1))].replace("'", "''") + "'", text)
+
+    # -- FROM / column resolution -------------------------------------------
+    def _parse_from(self, text: str):
+        match = _FROM.match(text.strip())
+        if not match:
+            raise Unsupported("from")
+        fact, fact_alias, dim, dim_alias, left, right = match.groups()
+        self.fact = self._table(fact)
+        self.scope = {(fact_alias or fact).lower(): self.fact}
+        self.dim = None
+        if dim:
+            self.dim = self._table(dim)
+            if self.dim == self.fact or (dim_alias or dim).lower() in self.scope:
+                raise Unsupported("self join")
+            self.scope[(dim_alias or dim).lower()] = self.dim
+            a, b = self.resolve(left), self.resolve(right)
+            if a[0] == self.dim:
+                a, b = b, a
+            dim_meta = self.snapshot.columns(self.dim).get(b[1], {})
+            if a[0] != self.fact or b[0] != self.dim or not dim_meta.get("primary_key"):
+                raise Unsupported("join must be <column> = <lookup single-column INTEGER PRIMARY KEY>")
+            self.join_key = a
+            self.dim_pk = b
+
+    def _table(self, name: str) -> str:
+        name = name.lower()
+        if name not in self.snapshot.tables:
+            raise Unsupported(f"no table {name}")
+        return name
+
+    def resolve(self, ref: str) -> tuple:
+        """Resolve ``alias.column`` or ``column`` to ``(table, column)``."""
+        ref = ref.lower()
+        if "." in ref:
+            qualifier, column = ref.split(".", 1)
+            table = self.scope.get(qualifier)
+            if table is None or column not in self.snapshot.columns(table):
+                raise Unsupported(f"unknown column {ref}")
+            found = [table]
+        else:
+            column = ref
+            found = [t for t in self.scope.values() if column in self.snapshot.columns(t)]
+            if len(found) != 1:
+                raise Unsupported(f"unknown or ambiguous column {ref}")
+        meta = self.snapshot.columns(found[0])[column]
+        if meta["nullable"]:
+            raise Unsupported(f"{found[0]}.{column} has NULLs")
+        return (found[0], column)
+
+    def _is_column(self, ref: str) -> bool:
+        """True if ``ref`` names a column of a table in scope, nullable or not."""
+        ref = ref.lower()
+        if "." in ref:
+            qualifier, column = ref.split(".", 1)
+            return qualifier in self.scope and column in self.snapshot.columns(self.scope[qualifier])
+        return any(ref in self.snapshot.columns(t) for t in self.scope.values())
+
+    def kind(self, col: tuple) -> str:
+        return self.snapshot.columns(col[0])[col[1]]["type"]
+
+    # -- expressions -----------------------------------------------------------
+    def parse_expr(self, text: str) -> tuple:
+        text = text.strip()
+        match = _ROUND.match(text)
+        if match:
+            inner = self.parse_expr(match.group(1))
+            if inner[0] != "agg":
+                raise Unsupported("ROUND() of a non-aggregate")
+            return ("agg", inner[1], inner[2], int(match.group(2) or 0))
+        match = _AGGREGATE.match(text)
+        if match:
+            func, arg = match.group(1).lower(), match.group(2)
+            if arg == "*":
+                if func != "count":
+                    raise Unsupported(f"{func}(*)")
+                return ("agg", "count", None, None)
+            col = self.resolve(arg)
+            if self.kind(col) == "text" and func != "count":
+                raise Unsupported(f"{func}() of a text column")
+            return ("agg", func, col, None)
+        if "||" in text:
+            parts = []
+            for part in text.split("||"):
+                part = part.strip()
+                literal = _LITERAL.match(part)
+                if literal:
+                    parts.append(("lit", self.literals[int(literal.group(1))]))
+                elif _REF.match(part):
+                    col = self.resolve(part)
+                    if self.kind(col) != "text":
+                        raise Unsupported("|| of a non-text column")
+                    parts.append(("col", col))
+                else:
+                    raise Unsupported("concatenation")
+            return ("concat", parts)
+        if _REF.match(text):
+            return ("col", self.resolve(text))
+        raise Unsupported(f"expression {text}")
+
+    def _operand(self, text: str):
+        text = text.strip()
+        literal = _LITERAL.match(text)
+        if literal:
+            return ("text", self.literals[int(literal.group(1))])
+        if _NUMBER.match(text):
+            return ("num", float(text) if "." in text else int(text))
+        if _REF.match(text):
+            col = self.resolve(text)
+            return ("text" if self.kind(col) == "text" else "num", col)
+        raise Unsupported(f"operand {text}")
+
+    # -- execution -------------------------------------------------------------
+    def column_values(self, col: tuple, rows=None):
+        """Values of a column for the given fact rows (all rows if None); lookup columns go through the join."""
+        values = self.snapshot.array(*col)
+        if col[0] == self.dim:
+            return values[self.dim_index if rows is None else self.dim_index[rows]]
+        return values if rows is None else values[rows]
+
+    def run(self) -> ResultCursor:
+        n_rows = self.snapshot.tables[self.fact]["rows"]
+        mask = np.ones(n_rows, dtype=bool)
+        self.dim_index = None
+        if self.dim is not None:
+            fk = np.asarray(self.snapshot.array(*self.join_key))
+            pk = self.snapshot.array(*self.dim_pk)
+            if len(pk) and pk[-1] - pk[0] == len(pk) - 1:
+                # Dense INTEGER PRIMARY KEY (rowid order): the key is the row position
+                pos = fk - pk[0]
+                found = (pos >= 0) & (pos < len(pk))
+            elif len(pk):
+                pos = np.minimum(np.searchsorted(pk, fk), len(pk) - 1)
+                found = pk[pos] == fk
+            else:
+                pos, found = np.zeros(n_rows, dtype=np.int64), np.zeros(n_rows, dtype=bool)
+            mask &= found
+            self.dim_index = np.where(found, pos, 0)
+
+        if self.clauses["where"]:
+            if "(" in self.clauses["where"]:
+                raise Unsupported("parenthesized WHERE")
+            for condition in re.split(r"\s+and\s+", self.clauses["where"], flags=re.IGNORECASE):
+                match = _CONDITION.match(condition.strip())
+                if not match:
+                    raise Unsupported("condition")
+                (left_kind, left), (right_kind, right) = self._operand(match.group(1)), self._operand(match.group(3))
+                if left_kind != right_kind:
+                    raise Unsupported("comparison across types")
+                left = self.column_values(left) if isinstance(left, tuple) else left
+                right = self.column_values(right) if isinstance(right, tuple) else right
+                mask &= np.asarray(COMPARISONS[match.group(2)](left, right), dtype=bool)
+
+        self.rows = np.flatnonzero(mask)
+        items = []
+        for item in _split_top_level(self.clauses["select"]):
+            match = re.match(r"^(.+?)\s+as\s+(\w+)$", item, re.IGNORECASE | re.DOTALL)
+            expr_text, alias = (match.group(1), match.group(2)) if match else (item, None)
+            expr = self.parse_expr(expr_text)
+            name = alias or (expr[1][1] if expr[0] == "col" else self._unmask(expr_text.strip()))
+            items.append({"expr": expr, "text": _canonical(expr_text), "alias": (alias or "").lower(), "name": name})
+
+        limit = int(self.clauses["limit"]) if self.clauses["limit"] is not None else None
+        if self.clauses["group"] is None and self.clauses["having"]:
+            raise Unsupported("HAVING without GROUP BY")
+
+        if self.clauses["group"] is not None:
+            selected = self._group(items)
+            order = self._order(items, selected, limit) if self.clauses["order"] else np.arange(len(selected))
+            # Name columns are built only for the groups that survive LIMIT
+            groups = selected[order[:limit] if limit is not None else order]
+            columns = [self._group_values(item["expr"], groups) for item in items]
+            return _result(items, columns, range(len(groups)))
+
+        if any(item["expr"][0] == "agg" for item in items):
+            if any(item["expr"][0] != "agg" for item in items):
+                raise Unsupported("bare column in an aggregate query")
+            if self.clauses["order"]:
+                self._order_expr(items)
+            columns = [self._aggregate_all(item["expr"]) for item in items]
+            return _result(items, columns, range(1 if limit is None else min(limit, 1)))
+
+        if not self.clauses["order"]:
+            raise Unsupported("projection without ORDER BY has no defined row order")
+        # Sort on the key column first so only the rows that survive LIMIT are materialized
+        order = self._order(items, None, limit)
+        rows = self.rows[order[:limit] if limit is not None else order]
+        columns = [self._project(item["expr"], rows) for item in items]
+        return _result(items, columns, range(len(rows)))
+
+    def _project(self, expr: tuple, rows):
+        if expr[0] == "col":
+            return self.column_values(expr[1], rows)
+        if expr[0] == "concat":
+            out = np.full(len(rows), "", dtype=object)
+            for kind, value in expr[1]:
+                out = out + (value if kind == "lit" else self.column_values(value, rows).astype(object))
+            return out
+        raise Unsupported("aggregate in a projection")
+
+    def _aggregate_all(self, expr: tuple) -> list:
+        _, func, col, digits = expr
+        n = len(self.rows)
+        if func == "count":
+            return [n]
+        values = self.column_values(col, self.rows)
+        is_real = self.kind(col) == "real"
+        if func in ("sum", "avg") and is_real and digits is None:
+            raise Unsupported("unrounded SUM/AVG of a REAL column")
+        if n == 0:
+            return [None]
+        if func in ("min", "max"):
+            value = values.min() if func == "min" else values.max()
+        else:
+            total = math.fsum(values.tolist()) if is_real else int(values.sum())
+            value = total / n if func == "avg" else total
+        return _round([_python(value)], digits) if digits is not None else [value]
+
+    def _group(self, items):
+        """Assign filtered rows to groups and apply HAVING; returns the kept group numbers in key order."""
+        group_col = self.resolve(self.clauses["group"].strip())
+        keys = self.column_values(group_col, self.rows)
+        if keys.dtype.kind == "i" and len(keys) and int(keys.max()) - int(keys.min()) <= 4 * len(keys) + 1024:
+            # Ids are dense enough to count directly instead of sorting
+            offsets = keys - keys.min()
+            all_counts = np.bincount(offsets)
+            present = np.flatnonzero(all_counts)
+            remap = np.zeros(len(all_counts), dtype=np.int64)
+            remap[present] = np.arange(len(present))
+            inverse, counts = remap[offsets], all_counts[present]
+        else:
+            _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        # Any row of a group works as its representative for columns the group key determines
+        representative = np.empty(len(counts), dtype=np.int64)
+        representative[inverse] = self.rows
+        self._groups = (group_col, inverse, counts, representative)
+
+        all_groups = np.arange(len(counts))
+        keep = np.ones(len(counts), dtype=bool)
+        for condition in re.split(r"\s+and\s+", self.clauses["having"] or "", flags=re.IGNORECASE):
+            if not condition.strip():
+                continue
+            match = _CONDITION.match(condition.strip())
+            if not match or not _NUMBER.match(match.group(3).strip()):
+                raise Unsupported("HAVING condition")
+            lhs = match.group(1).strip()
+            aliased = [item for item in items if item["alias"] == lhs.lower() and item["expr"][0] == "agg"]
+            # SQLite resolves a HAVING name to a table column before a SELECT alias
+            if aliased and self._is_column(lhs):
+                raise Unsupported(f"HAVING {lhs} is both a column and an alias")
+            values = np.asarray(self._group_values(aliased[0]["expr"] if aliased else self.parse_expr(lhs), all_groups))
+            bound = float(match.group(3)) if "." in match.group(3) else int(match.group(3))
+            keep &= COMPARISONS[match.group(2)](values, bound)
+        return np.flatnonzero(keep)
+
+    def _depends_on_group(self, col: tuple) -> bool:
+        group_col = self._groups[0]
+        if col == group_col:
+            return True
+        # Lookup columns are fixed per group when grouping by either side of the join key
+        return self.dim is not None and col[0] == self.dim and group_col in (self.join_key, self.dim_pk)
+
+    def _group_values(self, expr: tuple, groups):
+        group_col, inverse, counts, representative = self._groups
+        if expr[0] in ("col", "concat"):
+            columns = [expr[1]] if expr[0] == "col" else [value for kind, value in expr[1] if kind == "col"]
+            if not all(self._depends_on_group(col) for col in columns):
+                raise Unsupported("column not determined by GROUP BY")
+            return self._project(expr, representative[groups])
+
+        _, func, col, digits = expr
+        if func == "count":
+            return counts[groups]
+        values = self.column_values(col, self.rows)
+        is_real = self.kind(col) == "real"
+        if func in ("min", "max"):
+            result = self.column_values(col, representative)
+            (np.minimum if func == "min" else np.maximum).at(result, inverse, values)
+        elif is_real:
+            if digits is None:
+                raise Unsupported("unrounded SUM/AVG of a REAL column")
+            result = np.bincount(inverse, weights=values, minlength=len(counts))
+            result = result if func == "sum" else result / counts
+        else:
+            # bincount sums in float64, which is exact for integer totals below 2**53
+            if len(values) and int(np.abs(values).max()) * len(values) >= 2 ** 53:
+                raise Unsupported("integer sum too large")
+            sums = np.rint(np.bincount(inverse, weights=values, minlength=len(counts))).astype(np.int64)
+            result = sums if func == "sum" else sums / counts
+        result = result[groups]
+        return _round(result.tolist(), digits) if digits is not None else result
+
+    def _order_expr(self, items):
+        match = re.match(r"^(.+?)(?:\s+(asc|desc))?$", self.clauses["order"].strip(), re.IGNORECASE | re.DOTALL)
+        text, direction = match.group(1), (match.group(2) or "asc").lower()
+        if len(_split_top_level(text)) > 1:
+            raise Unsupported("multi-column ORDER BY")
+        canonical = _canonical(text)
+        for item in items:
+            if item["alias"] == text.strip().lower() or item["text"] == canonical:
+                return item["expr"], direction
+        return self.parse_expr(text), direction
+
+    def _order(self, items, groups, limit):
+        """Row (or group) positions in ORDER BY order; ``groups`` is None for plain projections."""
+        expr, direction = self._order_expr(items)
+        if groups is not None:
+            sort_keys = self._group_values(expr, groups)
+        else:
+            sort_keys = self._project(expr, self.rows)
+        sort_keys = np.asarray(sort_keys)
+        if sort_keys.dtype == object:
+            sort_keys = np.asarray(sort_keys.tolist())
+        order = np.argsort(sort_keys, kind="stable")
+        if direction == "desc":
+            order = order[::-1]
+        # Rows with equal keys come out in plan-dependent order in SQLite; only answer when it cannot matter
+        window = sort_keys[order[:limit + 1] if limit is not None else order]
+        if len(np.unique(window)) != len(window):
+            raise Unsupported("ties in ORDER BY")
+        return order
+
+
+def _result(items: list, columns: list, order) -> ResultCursor:
+    rows = [tuple(_python(column[i]) for column in columns) for i in order]
+    return ResultCursor([item["name"] for item in items], rows)
+
+
+def _canonical(text: str) -> str:
+    return re.sub(r"\s+", "", text).lower()
+
+
+def _python(value):
+    return value.item() if hasattr(value, "item") else value
+
+
+def _round(values: list, digits: int) -> list:
+    """Apply SQLite's ROUND() so results match the SQLite path exactly."""
+    conn = sqlite3.connect(":memory:")
+    try:
+        return [
+            None if v is None else conn.execute("SELECT ROUND(?, ?)", (_python(v), digits)).fetchone()[0]
+            for v in values
+        ]
+    finally:
+        conn.close()
+
+
+class ColumnarSnapshot:
+    """Memory-mapped view of an exported snapshot."""
+
+    def __init__(self, path: str = COLUMNAR_DIR):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.tables = self.manifest["tables"]
+        self._arrays = {}
+        self._lock = threading.Lock()
+        self.served = 0
+        self.fallbacks = 0
+
+    def matches(self, fingerprint: tuple) -> bool:
+        """True if the snapshot was taken from the database a ConnectionPool.fingerprint() describes."""
+        _, file_id, version = fingerprint
+        return tuple(self.manifest["file_id"]) == tuple(file_id) and version == ("data", self.manifest["data_version"])
+
+    def columns(self, table: str) -> dict:
+        return self.tables[table]["columns"]
+
+    def array(self, table: str, column: str):
+        key = (table, column)
+        values = self._arrays.get(key)
+        if values is None:
+            with self._lock:
+                values = self._arrays.get(key)
+                if values is None:
+                    values = np.load(os.path.join(self.path, table, f"{column}.npy"), mmap_mode="r")
+                    self._arrays[key] = values
+        return values
+
+    def execute(self, sql: str):
+        """Answer ``sql`` from the snapshot, or return None if it is outside the whitelist."""
+        try:
+            result = _Query(self, sql).run()
+        except Unsupported:
+            self.fallbacks += 1
+            return None
+        self.served += 1
+        return result
+
+    def stats(self) -> dict:
+        return {"served": self.served, "fallbacks": self.fallbacks, "data_version": self.manifest["data_version"]}
+
+
+def load_snapshot(path: str = COLUMNAR_DIR):
+    """Return the snapshot at ``path``, or None if numpy is missing or nothing current was exported."""
+    if np is None or not os.path.exists(os.path.join(path, MANIFEST)):
+        return None
+    snapshot = ColumnarSnapshot(path)
+    return snapshot if snapshot.manifest.get("format") == SNAPSHOT_FORMAT else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the NBA database as a columnar .npy snapshot.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--out", default=COLUMNAR_DIR)
+    args = parser.parse_args()
+    manifest = export_snapshot(args.db, args.out)
+    rows = sum(t["rows"] for t in manifest["tables"].values())
+    print(f"Exported {len(manifest['tables'])} tables ({rows} rows) to {args.out} "
+          f"at data version {manifest['data_version']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Thread-safe pool of read-only SQLite connections for the NBA database."""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Tunables (override via environment)
+POOL_SIZE = int(os.environ.get("NBA_DB_POOL_SIZE", "8"))
+MMAP_SIZE = int(os.environ.get("NBA_DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+CACHE_SIZE_KB = int(os.environ.get("NBA_DB_CACHE_SIZE_KB", str(64 * 1024)))
+CHECKOUT_TIMEOUT = float(os.environ.get("NBA_DB_CHECKOUT_TIMEOUT", "30"))
+
+
+class PoolClosedError(RuntimeError):
+    """Raised when a connection is requested from a closed pool."""
+
+
+class ConnectionPool:
+    """Bounded pool of read-only, URI-mode SQLite connections.
+
+    At most ``max_connections`` connections are checked out at once; callers
+    beyond that block until one is returned. Connections are opened in
+    autocommit mode so no read transaction is held between queries, which keeps
+    WAL checkpoints unblocked. If the database file is replaced on disk (e.g.
+    by re-running ``setup_db.py``) idle connections are discarded and reopened
+    against the new file.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_connections: int = POOL_SIZE,
+        mmap_size: int = MMAP_SIZE,
+        cache_size_kb: int = CACHE_SIZE_KB,
+    ):
+        self.db_path = db_path
+        self.max_connections = max_connections
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._idle = []
+        self._file_id = None
+        self._closed = False
+        self._probe = None
+        self._probe_file_id = None
+
+    def _current_file_id(self):
+        try:
+            st = os.stat(self.db_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_dev, st.st_ino)
+
+    def _open(self) -> sqlite3.Connection:
+        uri = f"file:{self.db_path}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        # Negative cache_size is interpreted by SQLite as KiB rather than pages
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        if not self._slots.acquire(timeout=CHECKOUT_TIMEOUT):
+            raise TimeoutError(f"Timed out waiting for a connection to {self.db_path}")
+        try:
+            with self._lock:
+                if self._closed:
+                    raise PoolClosedError("Connection pool is closed")
+                file_id = self._current_file_id()
+                if file_id != self._file_id:
+                    self._discard_idle()
+                    self._file_id = file_id
+                if self._idle:
+                    return self._idle.pop()
+            return self._open()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, conn: sqlite3.Connection, broken: bool = False):
+        try:
+            with self._lock:
+                if self._closed or broken or self._current_file_id() != self._file_id:
+                    conn.close()
+                else:
+                    self._idle.append(conn)
+        finally:
+            self._slots.release()
+
+    def _discard_idle(self):
+        while self._idle:
+            self._idle.pop().close()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a ``with`` block."""
+        conn = self._acquire()
+        broken = False
+        try:
+            yield conn
+        except sqlite3.DatabaseError as e:
+            # Errors in the SQL itself leave the connection usable
+            broken = not isinstance(e, sqlite3.OperationalError)
+            raise
+        finally:
+            self._release(conn, broken=broken)
+
+    def fingerprint(self) -> tuple:
+        """Return ``(path, file_id, version)`` identifying the current database contents.
+
+        ``setup_db.py`` stamps a data version into ``PRAGMA user_version`` and
+        bumps it in the same transaction as every ingest, so when it is set
+        the version is ``("data", user_version)`` and changes exactly when the
+        data does (an ``ANALYZE`` or ``VACUUM`` does not invalidate caches).
+        Databases without one fall back to ``("file", mtime_ns, data_version)``.
+        ``PRAGMA data_version`` is only comparable within a single connection,
+        so it is read from a dedicated probe connection that never runs user
+        queries; it changes whenever another connection commits.
+        """
+        with self._lock:
+            if self._closed:
+                raise PoolClosedError("Connection pool is closed")
+            st = os.stat(self.db_path)
+            file_id = (st.st_dev, st.st_ino)
+            if self._probe is None or self._probe_file_id != file_id:
+                if self._probe is not None:
+                    self._probe.close()
+                self._probe = self._open()
+                self._probe_file_id = file_id
+            user_version = self._probe.execute("PRAGMA user_version").fetchone()[0]
+            if user_version:
+                return (self.db_path, file_id, ("data", user_version))
+            data_version = self._probe.execute("PRAGMA data_version").fetchone()[0]
+            return (self.db_path, file_id, ("file", st.st_mtime_ns, data_version))
+
+    def close(self):
+        """Close all idle connections and refuse further checkouts."""
+        with self._lock:
+            self._closed = True
+            self._discard_idle()
+            if self._probe is not None:
+                self._probe.close()
+                self._probe = None
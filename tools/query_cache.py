@@ -0,0 +1,110 @@
+"""LRU/TTL cache for serialized SQL query results."""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Single-quoted string literals (with '' escapes) and double-quoted identifiers
+_QUOTED_RE = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+_WHITESPACE_RE = re.compile(r"\s+")
+_PUNCT_SPACE_RE = re.compile(r"\s*([(),])\s*")
+
+
+def cache_sql(query: str) -> str:
+    """The part of a query that identifies its result, for use in result-cache keys.
+
+    Only surrounding whitespace and trailing semicolons are dropped. SQLite
+    names an unaliased result column after the exact source text of its
+    expression (``COUNT(*)`` vs ``count( * )``), so case and inner whitespace
+    are visible in the output and must stay in the key.
+    """
+    return query.strip().rstrip(";").strip()
+
+
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace and lowercase a query, leaving quoted literals untouched.
+
+    Equal results can still differ in column names, so this is only for keys
+    where names do not matter (see ``cache_sql`` for the result cache).
+    """
+    parts = _QUOTED_RE.split(query.strip().rstrip(";").strip())
+    normalized = []
+    for i, part in enumerate(parts):
+        if i % 2:
+            normalized.append(part)
+        else:
+            part = _WHITESPACE_RE.sub(" ", part.lower())
+            normalized.append(_PUNCT_SPACE_RE.sub(r"\1", part))
+    return "".join(normalized).strip()
+
+
+class QueryResultCache:
+    """Thread-safe LRU cache bounded by total payload size, with per-entry TTL.
+
+    Keys are arbitrary hashables (normally the ``cache_sql`` text plus a database
+    fingerprint); values are the serialized result strings returned to the
+    agent, so an entry's size is simply its length.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value: str):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
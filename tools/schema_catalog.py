@@ -0,0 +1,104 @@
+"""In-memory catalog of the NBA database schema.
+
+The schema only changes when ``setup_db.py`` rebuilds the database, so it is
+read once from ``sqlite_master`` and the ``PRAGMA table_info`` /
+``foreign_key_list`` / ``index_list`` pragmas and then served from memory.
+The catalog is rebuilt only when the DB file's mtime or ``schema_version``
+changes.
+"""
+
+import os
+import threading
+
+
+class SchemaCatalog:
+    """Lazily built, self-invalidating view of the database schema."""
+
+    def __init__(self, pool, table_notes: dict = None):
+        self.pool = pool
+        # Optional one-line descriptions rendered next to tables in the prompt section
+        self.table_notes = table_notes or {}
+        self._lock = threading.Lock()
+        self._version = None
+        self._tables = None
+        self._prompt_section = None
+
+    def _current_version(self, conn):
+        mtime = os.stat(self.pool.db_path).st_mtime_ns
+        schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        return (mtime, schema_version)
+
+    def _build(self, conn) -> dict:
+        tables = {}
+        names = [
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+        ]
+        for name in names:
+            columns = [
+                {
+                    "name": row[1],
+                    "type": row[2],
+                    "notnull": bool(row[3]),
+                    "primary_key": bool(row[5]),
+                }
+                for row in conn.execute(f"PRAGMA table_info({name})")
+            ]
+            foreign_keys = [
+                {"column": row[3], "references_table": row[2], "references_column": row[4]}
+                for row in conn.execute(f"PRAGMA foreign_key_list({name})")
+            ]
+            indexes = []
+            for row in conn.execute(f"PRAGMA index_list({name})"):
+                index_name = row[1]
+                index_columns = [c[2] for c in conn.execute(f"PRAGMA index_info({index_name})")]
+                indexes.append({"name": index_name, "unique": bool(row[2]), "columns": index_columns})
+            tables[name] = {"columns": columns, "foreign_keys": foreign_keys, "indexes": indexes}
+        return tables
+
+    def tables(self) -> dict:
+        """Return ``{table_name: {"columns", "foreign_keys", "indexes"}}``, rebuilding if stale."""
+        with self.pool.connection() as conn:
+            version = self._current_version(conn)
+            with self._lock:
+                if version != self._version:
+                    self._tables = self._build(conn)
+                    self._prompt_section = None
+                    self._version = version
+                return self._tables
+
+    def list_tables(self) -> list:
+        return list(self.tables())
+
+    def describe_table(self, table_name: str) -> list:
+        """Return the column list for a table, or an empty list if it does not exist."""
+        table = self.tables().get(table_name)
+        return table["columns"] if table else []
+
+    def prompt_section(self) -> str:
+        """Render the schema as a compact system-prompt section."""
+        tables = self.tables()
+        with self._lock:
+            if self._prompt_section is None:
+                self._prompt_section = _render_prompt_section(tables, self.table_notes)
+            return self._prompt_section
+
+
+def _render_prompt_section(tables: dict, table_notes: dict) -> str:
+    lines = ["## Database Schema", "Each table is listed as name(column TYPE, ...). PK = primary key, -> = foreign key."]
+    for name, table in tables.items():
+        fks = {fk["column"]: f"{fk['references_table']}.{fk['references_column']}" for fk in table["foreign_keys"]}
+        cols = []
+        for col in table["columns"]:
+            text = f"{col['name']} {col['type']}"
+            if col["primary_key"]:
+                text += " PK"
+            if col["name"] in fks:
+                text += f" -> {fks[col['name']]}"
+            cols.append(text)
+        lines.append(f"- {name}({', '.join(cols)})")
+        if name in table_notes:
+            lines.append(f"  {table_notes[name]}")
+    return "\n".join(lines)
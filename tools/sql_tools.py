@@ -1,44 +1,212 @@
 """SQL tools for querying the NBA SQLite database."""
 
+import atexit
 import json
 import os
 import re
-import sqlite3
 
 import braintrust
 
+from tools.columnar import COLUMNAR_DIR, load_snapshot
+from tools.db_pool import ConnectionPool
+from tools.query_cache import QueryResultCache, cache_sql
+from tools.schema_catalog import SchemaCatalog
+
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "nba.db")
 
+# Result cache tunables (override via environment)
+QUERY_CACHE_ENABLED = os.environ.get("NBA_SQL_CACHE", "1") != "0"
+QUERY_CACHE_MAX_BYTES = int(os.environ.get("NBA_SQL_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+QUERY_CACHE_TTL = float(os.environ.get("NBA_SQL_CACHE_TTL", "600"))
+
+# Result size budget and encoding (override via environment)
+RESULT_MAX_ROWS = int(os.environ.get("NBA_SQL_MAX_ROWS", "200"))
+RESULT_MAX_BYTES = int(os.environ.get("NBA_SQL_MAX_BYTES", str(32 * 1024)))
+RESULT_FORMAT = os.environ.get("NBA_SQL_RESULT_FORMAT", "records")  # "records" or "columnar"
+FETCH_SIZE = 256
+
+# NumPy answers for simple aggregate queries from a snapshot written by `python -m tools.columnar`
+COLUMNAR_ENABLED = os.environ.get("NBA_SQL_COLUMNAR", "0") == "1"
+COLUMNAR_PATH = os.environ.get("NBA_SQL_COLUMNAR_PATH", COLUMNAR_DIR)
+
+# Hints shown next to derived tables in the schema prompt section
+TABLE_NOTES = {
+    "player_season_stats": "Precomputed per-player season totals and per-game averages (one row per player, season "
+                           "and team). Prefer it over aggregating player_game_stats for season leaders.",
+    "team_season_records": "Precomputed per-team season win/loss records, home and away. Prefer it over counting "
+                           "wins from games.",
+    "team_season_shooting": "Precomputed per-team season averages of team_game_stats (points, FG%, 3P%, FT%).",
+}
+
+_pool = None
+_catalog = None
+_query_cache = QueryResultCache(QUERY_CACHE_MAX_BYTES, QUERY_CACHE_TTL) if QUERY_CACHE_ENABLED else None
+_columnar = None
+_columnar_version = None
+
+
+def get_pool() -> ConnectionPool:
+    """Return the shared read-only connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+def get_schema_catalog() -> SchemaCatalog:
+    """Return the shared schema catalog, creating it on first use."""
+    global _catalog
+    if _catalog is None:
+        _catalog = SchemaCatalog(get_pool(), table_notes=TABLE_NOTES)
+    return _catalog
+
+
+def close_pool():
+    """Close the shared connection pool. Safe to call more than once."""
+    global _pool, _catalog
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+    _catalog = None
+
+
+atexit.register(close_pool)
+
+
+def query_cache_stats() -> dict:
+    """Hit/miss/eviction counters for the run_sql_query result cache."""
+    if _query_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **_query_cache.stats()}
+
+
+def clear_query_cache():
+    if _query_cache is not None:
+        _query_cache.clear()
+
+
+def get_columnar_snapshot(fingerprint: tuple = None):
+    """Return the columnar snapshot if it is enabled and was taken from the current database, else None."""
+    global _columnar, _columnar_version
+    if not COLUMNAR_ENABLED:
+        return None
+    fingerprint = fingerprint or get_pool().fingerprint()
+    manifest = os.path.join(COLUMNAR_PATH, "manifest.json")
+    version = (fingerprint, os.stat(manifest).st_mtime_ns if os.path.exists(manifest) else None)
+    if version != _columnar_version:
+        # A snapshot from an older data version is ignored until it is re-exported
+        snapshot = load_snapshot(COLUMNAR_PATH)
+        _columnar = snapshot if snapshot is not None and snapshot.matches(fingerprint) else None
+        _columnar_version = version
+    return _columnar
+
+
+def columnar_stats() -> dict:
+    """Queries served from the columnar snapshot vs. handed to SQLite."""
+    snapshot = get_columnar_snapshot()
+    if snapshot is None:
+        return {"enabled": False}
+    return {"enabled": True, **snapshot.stats()}
+
+
+def _serialize_rows(cur, max_rows: int, max_bytes: int, result_format: str) -> str:
+    """Stream rows from a cursor into JSON, stopping once the row or byte budget is spent.
+
+    ``records`` yields a list of dicts (unchanged from the original output when
+    nothing is truncated). ``columnar`` yields ``{"columns": [...], "rows": [[...], ...]}``
+    so column names are sent once instead of once per row. When the budget is
+    hit, the remaining rows are counted but not materialized and the result is
+    wrapped with ``truncated``/``total_rows`` markers.
+    """
+    columns = [d[0] for d in cur.description] if cur.description else []
+    columnar = result_format == "columnar"
+    parts = []
+    used_bytes = 0
+    total_rows = 0
+    truncated = False
+
+    while True:
+        batch = cur.fetchmany(FETCH_SIZE)
+        if not batch:
+            break
+        if truncated:
+            total_rows += len(batch)
+            continue
+        for i, row in enumerate(batch):
+            if len(parts) >= max_rows:
+                truncated = True
+            else:
+                value = list(row) if columnar else dict(zip(columns, row))
+                encoded = json.dumps(value, default=str)
+                if used_bytes + len(encoded) > max_bytes:
+                    truncated = True
+                else:
+                    parts.append(encoded)
+                    used_bytes += len(encoded) + 2
+            if truncated:
+                total_rows += len(batch) - i
+                break
+            total_rows += 1
+
+    rows_json = "[" + ", ".join(parts) + "]"
+    if columnar:
+        body = f'"columns": {json.dumps(columns)}, "rows": {rows_json}, "row_count": {len(parts)}'
+    elif not truncated:
+        return rows_json
+    else:
+        body = f'"rows": {rows_json}, "row_count": {len(parts)}'
+    if truncated:
+        body += f', "truncated": true, "total_rows": {total_rows}'
+    return "{" + body + "}"
+
 
 # @braintrust.traced(name="run_sql_query")
-def run_sql_query(query: str, input_message: str = "") -> str:
-    """Execute a SQL query and return results as a list of dicts."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+def run_sql_query(
+    query: str,
+    input_message: str = "",
+    max_rows: int = None,
+    max_bytes: int = None,
+    result_format: str = None,
+    use_cache: bool = True,
+) -> str:
+    """Execute a SQL query and return results as JSON, bounded by a row/byte budget."""
+    max_rows = RESULT_MAX_ROWS if max_rows is None else max_rows
+    max_bytes = RESULT_MAX_BYTES if max_bytes is None else max_bytes
+    result_format = result_format or RESULT_FORMAT
     try:
-        cur = conn.cursor()
-        cur.execute(query)
-        rows = [dict(row) for row in cur.fetchall()]
-        return json.dumps(rows, default=str)
+        cache_key = None
+        fingerprint = get_pool().fingerprint() if (use_cache and _query_cache is not None) or COLUMNAR_ENABLED else None
+        if use_cache and _query_cache is not None:
+            # Keyed on the query text as written: a hit must return the same column names
+            cache_key = (cache_sql(query), max_rows, max_bytes, result_format, fingerprint)
+            cached = _query_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        snapshot = get_columnar_snapshot(fingerprint)
+        cur = snapshot.execute(query) if snapshot is not None else None
+        if cur is not None:
+            result = _serialize_rows(cur, max_rows, max_bytes, result_format)
+        else:
+            with get_pool().connection() as conn:
+                cur = conn.cursor()
+                cur.execute(query)
+                result = _serialize_rows(cur, max_rows, max_bytes, result_format)
+
+        if cache_key is not None:
+            _query_cache.put(cache_key, result)
+        return result
     except Exception as e:
         return json.dumps({"error": str(e)})
-    finally:
-        conn.close()
 
 
 # @braintrust.traced(name="list_tables")
 def list_tables() -> str:
     """List all tables in the database."""
-    conn = sqlite3.connect(DB_PATH)
     try:
-        cur = conn.cursor()
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-        tables = [row[0] for row in cur.fetchall()]
-        return json.dumps(tables)
+        return json.dumps(get_schema_catalog().list_tables())
     except Exception as e:
         return json.dumps({"error": str(e)})
-    finally:
-        conn.close()
 
 
 # @braintrust.traced(name="describe_table")
@@ -48,23 +216,10 @@ def describe_table(table_name: str) -> str:
     if not re.match(r"^[a-zA-Z_][a-zA-Z0-9_]*$", table_name):
         return json.dumps({"error": "Invalid table name"})
 
-    conn = sqlite3.connect(DB_PATH)
     try:
-        cur = conn.cursor()
-        cur.execute(f"PRAGMA table_info({table_name})")
-        columns = []
-        for row in cur.fetchall():
-            columns.append({
-                "name": row[1],
-                "type": row[2],
-                "notnull": bool(row[3]),
-                "primary_key": bool(row[5]),
-            })
-        return json.dumps(columns)
+        return json.dumps(get_schema_catalog().describe_table(table_name))
     except Exception as e:
         return json.dumps({"error": str(e)})
-    finally:
-        conn.close()
 
 
 # OpenAI function-calling tool definitions
@@ -73,7 +228,7 @@ SQL_TOOLS = [
         "type": "function",
         "function": {
             "name": "run_sql_query",
-            "description": "Execute a SQL query against the NBA database and return results as JSON.",
+            "description": "Execute a SQL query against the NBA database and return results as JSON. Large results are truncated, so aggregate or use LIMIT where possible.",
             "parameters": {
                 "type": "object",
                 "properties": {